@@ -1,5 +1,13 @@
+import mmap
+import multiprocessing
 import unittest
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Iterable
+from dataclasses import dataclass
+from itertools import repeat
 from pathlib import Path
+from typing import Self
 
 
 def file_lines(file_name: str) -> list[str]:
@@ -8,49 +16,162 @@ def file_lines(file_name: str) -> list[str]:
 
 
 def solve_part_one(file_name):
+    return solve_part_one_lines(file_lines(file_name))
+
+
+def solve_part_one_lines(lines: list[str]) -> int:
     def parse_line(line: str) -> int:
         digits = [char for char in line if char.isdigit()]
         return int(f"{digits[0]}{digits[-1]}")
 
-    line_results = [parse_line(line) for line in file_lines(file_name)]
+    line_results = [parse_line(line) for line in lines]
     return sum(line_results)
 
 
+NON_DIGIT_BYTES = bytes(byte for byte in range(256) if byte not in b"0123456789\n")
+
+
+def _chunk_sum(path: Path, start: int, end: int) -> int:
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Only digits and newlines survive, so the first digit of a line is
+        # the byte right after a newline and the last one the byte before.
+        digits = b"\n" + mm[start:end].translate(None, NON_DIGIT_BYTES) + b"\n"
+    return sum(
+        value * (10 * digits.count(b"\n%d" % value) + digits.count(b"%d\n" % value))
+        for value in range(1, 10)
+    )
+
+
+def _chunk_bounds(mm: mmap.mmap, chunk_size: int) -> list[tuple[int, int]]:
+    bounds = []
+    start = 0
+    while start < len(mm):
+        end = start + chunk_size
+        if end < len(mm):
+            newline = mm.find(b"\n", end - 1)
+            end = len(mm) if newline == -1 else newline + 1
+        else:
+            end = len(mm)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def solve_part_one_parallel(
+    file_name, workers: int | None = None, chunk_size: int = 64 * 1024 * 1024
+):
+    path = Path(__file__).parent / file_name
+    if path.stat().st_size == 0:
+        return 0
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        bounds = _chunk_bounds(mm, chunk_size)
+
+    # Workers have to see this script's functions, which only fork provides
+    # when it runs as a directory (`python 01/`).
+    with ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context("fork")
+    ) as pool:
+        starts, ends = zip(*bounds)
+        return sum(pool.map(_chunk_sum, repeat(path), starts, ends))
+
+
+SPELLED_DIGITS = {
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+}
+
+
+@dataclass(frozen=True)
+class DigitAutomaton:
+    # Aho-Corasick automaton with the failure links already folded into the
+    # transitions, so every character costs a single dict lookup.
+    transitions: list[dict[str, int]]
+    outputs: list[int | None]
+
+    @classmethod
+    def from_patterns(cls, patterns: dict[str, int]) -> Self:
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[int | None] = [None]
+        for pattern, value in patterns.items():
+            state = 0
+            for char in pattern:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append(None)
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state] = value
+
+        transitions: list[dict[str, int]] = [{} for _ in goto]
+        transitions[0] = dict(goto[0])
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in goto[state].items():
+                if state != 0:
+                    fail[child] = transitions[fail[state]].get(char, 0)
+                if outputs[child] is None:
+                    outputs[child] = outputs[fail[child]]
+                queue.append(child)
+            transitions[state] = transitions[fail[state]] | goto[state]
+
+        return cls(transitions=transitions, outputs=outputs)
+
+    def find(self, chars: Iterable[str]) -> int | None:
+        # None of the patterns contains another one, so the first match to
+        # complete is also the one starting first.
+        transitions, outputs = self.transitions, self.outputs
+        state = 0
+        for char in chars:
+            state = transitions[state].get(char, 0)
+            if (value := outputs[state]) is not None:
+                return value
+        return None
+
+
+DIGITS = {str(value): value for value in range(10)} | SPELLED_DIGITS
+FIRST_DIGIT = DigitAutomaton.from_patterns(DIGITS)
+LAST_DIGIT = DigitAutomaton.from_patterns(
+    {pattern[::-1]: value for pattern, value in DIGITS.items()}
+)
+
+
 def solve_part_two(file_name):
+    return solve_part_two_lines(file_lines(file_name))
+
+
+def solve_part_two_lines(lines: list[str]) -> int:
     def parse_line(line: str) -> int:
-        for i in range(len(line)):
-            first_number = get_number(i, line)
-            if first_number is not None:
-                break
-
-        for i in range(len(line) - 1, -1, -1):
-            last_number = get_number(i, line)
-            if last_number is not None:
-                break
-
-        return int(f"{first_number}{last_number}")
-
-    def get_number(i: int, line: str) -> int | None:
-        spelled_numbers = {
-            "one": 1,
-            "two": 2,
-            "three": 3,
-            "four": 4,
-            "five": 5,
-            "six": 6,
-            "seven": 7,
-            "eight": 8,
-            "nine": 9,
-        }
-
-        if line[i].isdigit():
-            return int(line[i])
-
-        for spelled, value in spelled_numbers.items():
-            if line[i:].startswith(spelled):
-                return value
+        first_number = FIRST_DIGIT.find(line)
+        last_number = LAST_DIGIT.find(reversed(line))
+        return first_number * 10 + last_number
+
+    return sum(parse_line(line) for line in lines)
 
-    return sum(parse_line(line) for line in file_lines(file_name))
+
+class DigitAutomatonTestCase(unittest.TestCase):
+    def test_find_first(self):
+        self.assertEqual(FIRST_DIGIT.find("two1nine"), 2)
+        self.assertEqual(FIRST_DIGIT.find("abcone2threexyz"), 1)
+        self.assertEqual(FIRST_DIGIT.find("xtwone3four"), 2)
+        self.assertEqual(FIRST_DIGIT.find("eightwothree"), 8)
+        self.assertEqual(FIRST_DIGIT.find("sevseven"), 7)
+        self.assertEqual(FIRST_DIGIT.find("abc"), None)
+
+    def test_find_last(self):
+        self.assertEqual(LAST_DIGIT.find(reversed("two1nine")), 9)
+        self.assertEqual(LAST_DIGIT.find(reversed("eightwo")), 2)
+        self.assertEqual(LAST_DIGIT.find(reversed("4nineeightseven2")), 2)
+        self.assertEqual(LAST_DIGIT.find(reversed("zoneight234oneight")), 8)
+        self.assertEqual(LAST_DIGIT.find(reversed("7pqrstsixteen")), 6)
 
 
 class Part1TestCase(unittest.TestCase):
@@ -63,6 +184,32 @@ class Part1TestCase(unittest.TestCase):
         self.assertEqual(found_solution, 54239)
 
 
+class Part1ParallelTestCase(unittest.TestCase):
+    def test_chunk_sum(self):
+        path = Path(__file__).parent / "sample_part1.txt"
+        size = path.stat().st_size
+        self.assertEqual(_chunk_sum(path, 0, size), 142)
+
+    def test_chunk_bounds(self):
+        path = Path(__file__).parent / "sample_part1.txt"
+        with path.open("rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                bounds = _chunk_bounds(mm, 5)
+                self.assertEqual(bounds[0], (0, 6))
+                self.assertEqual(bounds[-1][1], len(mm))
+                for (_, end), (start, _) in zip(bounds, bounds[1:]):
+                    self.assertEqual(end, start)
+                    self.assertEqual(mm[end - 1 : end], b"\n")
+
+    def test_sample(self):
+        found_solution = solve_part_one_parallel("sample_part1.txt", chunk_size=5)
+        self.assertEqual(found_solution, 142)
+
+    def test_solve(self):
+        found_solution = solve_part_one_parallel("input.txt", 4, chunk_size=4096)
+        self.assertEqual(found_solution, 54239)
+
+
 class Part2TestCase(unittest.TestCase):
     def test_sample(self):
         found_solution = solve_part_two("sample_part2.txt")
@@ -1,8 +1,12 @@
 import functools
 import operator
+import random
 import re
 import unittest
+from bisect import bisect_left, bisect_right
+from array import array
 from collections import defaultdict
+from collections.abc import Iterable
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Self
@@ -38,6 +42,135 @@ class PartOne:
                     return False
             return True
 
+    @dataclass(frozen=True)
+    class Table:
+        ids: array
+        set_games: array
+        colors: list[str]
+        counts: list[array]
+
+        # "Game <id>:" starts a game and its first set, ";" starts another set
+        TOKENS = re.compile(r"Game (\d+):|(\d+) (\w+)|;")
+
+        @classmethod
+        def from_lines(cls, lines: Iterable[str]) -> Self:
+            ids = array("L")
+            set_games = array("L")
+            columns: dict[str, array] = {}
+            for line in lines:
+                for token in cls.TOKENS.finditer(line):
+                    game_id, num, color = token.groups()
+                    if color is not None:
+                        column = columns.get(color)
+                        if column is None:
+                            # -1 marks a color missing from a set
+                            column = array("l", [-1]) * len(set_games)
+                            columns[color] = column
+                        column[-1] = int(num)
+                        continue
+                    if game_id is not None:
+                        ids.append(int(game_id))
+                    set_games.append(len(ids) - 1)
+                    for column in columns.values():
+                        column.append(-1)
+
+            return cls(
+                ids=ids,
+                set_games=set_games,
+                colors=list(columns.keys()),
+                counts=list(columns.values()),
+            )
+
+        def maxima(self) -> list[array]:
+            output = []
+            for column in self.counts:
+                game_maxima = array("l", [-1]) * len(self.ids)
+                for game, num in zip(self.set_games, column):
+                    if num > game_maxima[game]:
+                        game_maxima[game] = num
+                output.append(game_maxima)
+            return output
+
+        def possible_ids_sum(self, bag: dict[str, int]) -> int:
+            limits = [bag.get(color, -1) for color in self.colors]
+            return sum(
+                ID
+                for ID, *game_maxima in zip(self.ids, *self.maxima())
+                if all(num <= limit for num, limit in zip(game_maxima, limits))
+            )
+
+    @dataclass(frozen=True)
+    class BagIndex:
+        colors: list[str]
+        values: list[list[int]]
+        strides: list[int]
+        # None when the grid would be too large for the number of games
+        sums: list[int] | None
+        # otherwise the games' maxima followed by their ID, sorted by the
+        # first color's maximum
+        games: list[tuple[int, ...]]
+
+        # cells allowed per game before falling back to the sorted games
+        GRID_LIMIT = 16
+
+        @classmethod
+        def from_table(cls, table: "PartOne.Table") -> Self:
+            maxima = table.maxima()
+            values = [sorted(set(game_maxima)) for game_maxima in maxima]
+            strides = [1] * len(values)
+            for axis in range(len(values) - 2, -1, -1):
+                strides[axis] = strides[axis + 1] * len(values[axis + 1])
+            size = strides[0] * len(values[0]) if values else 1
+
+            if size > cls.GRID_LIMIT * max(len(table.ids), 1):
+                # The grid grows with the product of the distinct maxima of
+                # every color, so with many colors a scan over the games,
+                # cut short on the first color, is cheaper.
+                games = sorted(zip(*maxima, table.ids))
+                return cls(table.colors, values, strides, sums=None, games=games)
+
+            # One cell per combination of distinct maxima, turned into a
+            # prefix sum so that a cell holds every game it dominates.
+            sums = [0] * size
+            for ID, *game_maxima in zip(table.ids, *maxima):
+                cell = sum(
+                    bisect_left(axis_values, num) * stride
+                    for num, axis_values, stride in zip(game_maxima, values, strides)
+                )
+                sums[cell] += ID
+            for axis_values, stride in zip(values, strides):
+                for cell in range(size):
+                    if (cell // stride) % len(axis_values):
+                        sums[cell] += sums[cell - stride]
+
+            return cls(table.colors, values, strides, sums=sums, games=[])
+
+        def possible_ids_sum(self, bag: dict[str, int]) -> int:
+            if self.sums is None:
+                return self._scan(bag)
+            cell = 0
+            for color, axis_values, stride in zip(
+                self.colors, self.values, self.strides
+            ):
+                index = bisect_right(axis_values, bag.get(color, -1))
+                if index == 0:
+                    return 0
+                cell += (index - 1) * stride
+            return self.sums[cell]
+
+        def _scan(self, bag: dict[str, int]) -> int:
+            limits = [bag.get(color, -1) for color in self.colors]
+            # games whose first maximum is within the bag come first
+            end = bisect_right(self.games, (limits[0], float("inf")))
+            return sum(
+                game[-1]
+                for game in self.games[:end]
+                if all(num <= limit for num, limit in zip(game, limits))
+            )
+
+        def possible_ids_sums(self, bags: Iterable[dict[str, int]]) -> list[int]:
+            return [self.possible_ids_sum(bag) for bag in bags]
+
     def __init__(self, file_name: str) -> None:
         self.file_name = file_name
 
@@ -46,11 +179,21 @@ class PartOne:
         with (Path(__file__).parent / file_name).open() as f:
             return f.readlines()
 
+    def parse(self) -> Table:
+        lines = self.read_file(self.file_name)
+        return self.Table.from_lines(lines)
+
     def solve(self) -> int:
+        return self.solve_parsed(self.parse())
+
+    def solve_parsed(self, table: Table) -> int:
         bag_contents = {"blue": 14, "red": 12, "green": 13}
+        return table.possible_ids_sum(bag_contents)
+
+    def solve_bags(self, bags: Iterable[dict[str, int]]) -> list[int]:
         lines = self.read_file(self.file_name)
-        games = [PartOne.Game.from_line(line) for line in lines]
-        return sum(game.ID for game in games if game.possible(bag_contents))
+        index = self.BagIndex.from_table(self.Table.from_lines(lines))
+        return index.possible_ids_sums(bags)
 
 
 class PartOneTestCase(unittest.TestCase):
@@ -79,10 +222,95 @@ class PartOneTestCase(unittest.TestCase):
         self.assertTrue(game.possible({"blue": 10, "red": 10, "green": 10}))
         self.assertFalse(game.possible({"blue": 1}))
 
+    def test_parse_table(self):
+        table = PartOne.Table.from_lines(
+            [
+                "Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green",
+                "Game 7: 1 green",
+            ]
+        )
+        self.assertEqual(list(table.ids), [1, 7])
+        self.assertEqual(list(table.set_games), [0, 0, 0, 1])
+        self.assertEqual(table.colors, ["blue", "red", "green"])
+        self.assertEqual(
+            [list(column) for column in table.counts],
+            [[3, 6, -1, -1], [4, 1, -1, -1], [-1, 2, 2, 1]],
+        )
+        self.assertEqual(
+            [list(game_maxima) for game_maxima in table.maxima()],
+            [[6, -1], [4, -1], [2, 1]],
+        )
+
+    def test_table_possible_ids_sum(self):
+        table = PartOne.Table.from_lines(
+            [
+                "Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green",
+                "Game 7: 1 green",
+            ]
+        )
+        self.assertEqual(
+            table.possible_ids_sum({"blue": 10, "red": 10, "green": 10}), 8
+        )
+        self.assertEqual(table.possible_ids_sum({"green": 1}), 7)
+        self.assertEqual(table.possible_ids_sum({"blue": 1}), 0)
+
+    def test_bag_index(self):
+        table = PartOne.Table.from_lines(PartOne.read_file("input.txt"))
+        index = PartOne.BagIndex.from_table(table)
+        bags = [
+            {"blue": 14, "red": 12, "green": 13},
+            {"blue": 20, "red": 20, "green": 20},
+            {"blue": 5, "red": 9, "green": 7},
+            {"blue": 14, "red": 12},
+            {"blue": 0, "red": 0, "green": 0},
+            {"blue": 14, "red": 12, "green": 13, "yellow": 1},
+            {},
+        ]
+        self.assertEqual(
+            index.possible_ids_sums(bags),
+            [table.possible_ids_sum(bag) for bag in bags],
+        )
+        self.assertEqual(index.possible_ids_sum(bags[0]), 2632)
+        self.assertEqual(index.possible_ids_sum(bags[1]), 5050)
+
+    def test_bag_index_many_colors(self):
+        rng = random.Random(2)
+        colors = ["red", "green", "blue", "cyan", "magenta", "yellow"]
+        lines = [
+            f"Game {game}: "
+            + "; ".join(
+                ", ".join(
+                    f"{rng.randint(1, 40)} {color}"
+                    for color in rng.sample(colors, rng.randint(1, len(colors)))
+                )
+                for _ in range(rng.randint(1, 4))
+            )
+            for game in range(1, 501)
+        ]
+        table = PartOne.Table.from_lines(lines)
+        index = PartOne.BagIndex.from_table(table)
+        self.assertIsNone(index.sums)
+        bags = [
+            {color: rng.randint(0, 45) for color in rng.sample(colors, 4)}
+            for _ in range(50)
+        ]
+        bags += [dict.fromkeys(colors, 40), dict.fromkeys(colors, 30), {}]
+        self.assertEqual(
+            index.possible_ids_sums(bags),
+            [table.possible_ids_sum(bag) for bag in bags],
+        )
+        self.assertEqual(index.possible_ids_sum(bags[-3]), 500 * 501 // 2)
+
     def test_sample(self):
         found_solution = PartOne("sample.txt").solve()
         self.assertEqual(found_solution, 8)
 
+    def test_sample_bags(self):
+        found_solutions = PartOne("sample.txt").solve_bags(
+            [{"blue": 14, "red": 12, "green": 13}, {"blue": 6, "red": 4, "green": 3}]
+        )
+        self.assertEqual(found_solutions, [8, 3])
+
     def test_solve(self):
         found_solution = PartOne("input.txt").solve()
         self.assertEqual(found_solution, 2632)
@@ -104,10 +332,17 @@ class PartTwo(PartOne):
         def power(set: dict[str, int]) -> int:
             return functools.reduce(operator.mul, set.values(), 1)
 
-    def solve(self) -> int:
-        lines = self.read_file(self.file_name)
-        games = [PartTwo.Game.from_line(line) for line in lines]
-        return sum(game.minimum_set_power() for game in games)
+    class Table(PartOne.Table):
+        def minimum_set_powers(self) -> list[int]:
+            return [
+                functools.reduce(
+                    operator.mul, (num for num in game_maxima if num >= 0), 1
+                )
+                for game_maxima in zip(*self.maxima())
+            ]
+
+    def solve_parsed(self, table: Table) -> int:
+        return sum(table.minimum_set_powers())
 
 
 class PartTwoTestCase(unittest.TestCase):
@@ -145,6 +380,15 @@ class PartTwoTestCase(unittest.TestCase):
             48,
         )
 
+    def test_table_minimum_set_powers(self):
+        table = PartTwo.Table.from_lines(
+            [
+                "Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green",
+                "Game 2: 1 red, 2 green",
+            ]
+        )
+        self.assertEqual(table.minimum_set_powers(), [48, 2])
+
     def test_sample(self):
         found_solution = PartTwo("sample.txt").solve()
         self.assertEqual(found_solution, 2286)
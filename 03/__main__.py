@@ -1,6 +1,12 @@
+import mmap
+import multiprocessing
 import re
 import unittest
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from itertools import repeat
 from pathlib import Path
 from typing import Self
 
@@ -10,6 +16,96 @@ def read_file(file_name: str) -> list[str]:
         return [line.strip() for line in f.readlines()]
 
 
+SYMBOL_BITS = bytes(
+    ord("0") if chr(byte) in "0123456789." else ord("1") for byte in range(256)
+)
+
+
+def symbol_mask(line: str) -> int:
+    # bit c is set when column c holds a symbol
+    bits = line.encode().translate(SYMBOL_BITS)[::-1]
+    return int(bits, 2) if bits else 0
+
+
+def adjacency_masks(lines: list[str]) -> list[int]:
+    widened = [mask | mask << 1 | mask >> 1 for mask in map(symbol_mask, lines)]
+    above = [0] + widened[:-1]
+    below = widened[1:] + [0]
+    return [a | b | c for a, b, c in zip(above, widened, below)]
+
+
+BandValues = Callable[[list[str], int, int], list[int]]
+
+
+def bands(lines: Iterable[str], rows: int) -> Iterator[tuple[list[str], int, int]]:
+    # blocks of rows, each with one neighbouring row on either side when there
+    # is one, along with the range of rows the block owns
+    band: list[str] = []
+    first = 0
+    for line in lines:
+        band.append(line.strip())
+        if len(band) - first == rows + 1:
+            yield band, first, first + rows
+            band = band[-2:]
+            first = 1
+    if len(band) > first:
+        yield band, first, len(band)
+
+
+def _band_bounds(mm: mmap.mmap, band_size: int) -> list[tuple[int, int]]:
+    bounds = []
+    start = 0
+    while start < len(mm):
+        end = start + band_size
+        if end < len(mm):
+            newline = mm.find(b"\n", end - 1)
+            end = len(mm) if newline == -1 else newline + 1
+        else:
+            end = len(mm)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _band_sum(
+    path: Path,
+    start: int,
+    end: int,
+    band_values: BandValues,
+) -> int:
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # one halo row on each side, read but not owned by this band
+        halo_start = mm.rfind(b"\n", 0, start - 1) + 1 if start > 0 else 0
+        halo_end = mm.find(b"\n", end) + 1 if end < len(mm) else end
+        if halo_end == 0:
+            halo_end = len(mm)
+        lines = mm[halo_start:halo_end].decode().splitlines()
+        first = 1 if start > 0 else 0
+        last = len(lines) - 1 if end < len(mm) else len(lines)
+    return sum(band_values(lines, first, last))
+
+
+def solve_parallel(
+    file_name: str,
+    band_values: BandValues,
+    workers: int | None = None,
+    band_size: int = 16 * 1024 * 1024,
+) -> int:
+    path = Path(__file__).parent / file_name
+    if path.stat().st_size == 0:
+        return 0
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        bounds = _band_bounds(mm, band_size)
+
+    # Workers have to see this script's functions, which only fork provides
+    # when it runs as a directory (`python 03/`).
+    with ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context("fork")
+    ) as pool:
+        starts, ends = zip(*bounds)
+        return sum(pool.map(_band_sum, repeat(path), starts, ends, repeat(band_values)))
+
+
 class PartOne:
     @dataclass(frozen=True)
     class Number:
@@ -34,8 +130,10 @@ class PartOne:
             return found
 
         def has_adjacent_symbol(self, lines: list[str]) -> bool:
-            for row in range(self.row - 1, self.row + 2):
-                for column in range(self.column - 1, self.column + self.length + 1):
+            for row in range(max(self.row - 1, 0), self.row + 2):
+                for column in range(
+                    max(self.column - 1, 0), self.column + self.length + 1
+                ):
                     try:
                         char = lines[row][column]
                     except IndexError:
@@ -45,15 +143,46 @@ class PartOne:
                         return True
             return False
 
+        def touches(self, masks: list[int]) -> bool:
+            return masks[self.row] >> self.column & ((1 << self.length) - 1) != 0
+
     def __init__(self, file_name: str) -> None:
         self.file_name = file_name
 
-    def solve(self) -> int:
+    def parse(self) -> tuple[list[Number], list[int]]:
         lines = read_file(self.file_name)
-        numbers = PartOne.Number.parse_lines(lines)
-        return sum(
-            number.value for number in numbers if number.has_adjacent_symbol(lines)
-        )
+        return PartOne.Number.parse_lines(lines), adjacency_masks(lines)
+
+    def solve(self) -> int:
+        return self.solve_parsed(self.parse())
+
+    def solve_parsed(self, parsed: tuple[list[Number], list[int]]) -> int:
+        numbers, masks = parsed
+        return sum(number.value for number in numbers if number.touches(masks))
+
+    @staticmethod
+    def band_values(lines: list[str], first: int, last: int) -> list[int]:
+        masks = adjacency_masks(lines)
+        numbers = PartOne.Number.parse_lines(lines[first:last])
+        return [
+            number.value
+            for number in numbers
+            if masks[first + number.row] >> number.column & ((1 << number.length) - 1)
+        ]
+
+    @classmethod
+    def stream(cls, lines: Iterable[str], rows: int = 1024) -> Iterator[int]:
+        for band, first, last in bands(lines, rows):
+            yield from cls.band_values(band, first, last)
+
+    @classmethod
+    def solve_stream(cls, lines: Iterable[str]) -> int:
+        return sum(cls.stream(lines))
+
+    def solve_parallel(
+        self, workers: int | None = None, band_size: int = 16 * 1024 * 1024
+    ) -> int:
+        return solve_parallel(self.file_name, self.band_values, workers, band_size)
 
 
 class PartOneTestCase(unittest.TestCase):
@@ -111,6 +240,50 @@ class PartOneTestCase(unittest.TestCase):
             ]
         )
 
+    def test_has_adjacent_symbol_no_wrap(self):
+        lines = [
+            "1....",
+            ".....",
+            "....#",
+        ]
+        self.assertFalse(PartOne.Number(1, 0, 0, 1).has_adjacent_symbol(lines))
+        self.assertFalse(PartOne.Number(1, 0, 0, 1).touches(adjacency_masks(lines)))
+
+    def test_symbol_mask(self):
+        self.assertEqual(symbol_mask("467..114.."), 0)
+        self.assertEqual(symbol_mask("...*......"), 0b1000)
+        self.assertEqual(symbol_mask("#.12.+"), 0b100001)
+        self.assertEqual(symbol_mask(""), 0)
+
+    def test_adjacency_masks(self):
+        masks = adjacency_masks(
+            [
+                "..........",
+                "...*......",
+                "..........",
+                "..........",
+            ]
+        )
+        self.assertEqual(masks, [0b11100, 0b11100, 0b11100, 0])
+
+    def test_touches(self):
+        for lines in (
+            read_file("sample.txt"),
+            read_file("input.txt"),
+            [
+                "+++++",
+                "+...+",
+                "+.1.+",
+                "+...+",
+                "+++++",
+            ],
+        ):
+            masks = adjacency_masks(lines)
+            for number in PartOne.Number.parse_lines(lines):
+                self.assertEqual(
+                    number.touches(masks), number.has_adjacent_symbol(lines), number
+                )
+
     def test_has_adjacent_symbol_sample(self):
         lines = read_file("sample.txt")
 
@@ -138,10 +311,58 @@ class PartOneTestCase(unittest.TestCase):
                 number.value not in {775, 992, 382, 927},
             )
 
+    def test_bands(self):
+        lines = ["12.\n", "..*\n", "3..\n"]
+        self.assertEqual(
+            list(bands(lines, 1)),
+            [
+                (["12.", "..*"], 0, 1),
+                (["12.", "..*", "3.."], 1, 2),
+                (["..*", "3.."], 1, 2),
+            ],
+        )
+        self.assertEqual(
+            list(bands(lines, 2)),
+            [(["12.", "..*", "3.."], 0, 2), (["..*", "3.."], 1, 2)],
+        )
+        self.assertEqual(list(bands(lines, 3)), [(["12.", "..*", "3.."], 0, 3)])
+        self.assertEqual(list(bands(["1\n"], 4)), [(["1"], 0, 1)])
+        self.assertEqual(list(bands([], 4)), [])
+
+    def test_stream(self):
+        for rows in (1, 2, 3, 1024):
+            with (Path(__file__).parent / "sample.txt").open() as f:
+                self.assertEqual(
+                    list(PartOne.stream(f, rows)),
+                    [467, 35, 633, 617, 592, 755, 664, 598],
+                )
+
     def test_sample(self):
         found_solution = PartOne("sample.txt").solve()
         self.assertEqual(found_solution, 4361)
 
+    def test_solve_stream(self):
+        with (Path(__file__).parent / "input.txt").open() as f:
+            self.assertEqual(PartOne.solve_stream(f), 540025)
+
+    def test_band_sum(self):
+        path = Path(__file__).parent / "sample.txt"
+        # bands of rows 0-2, 3-6 and 7-9
+        self.assertEqual(_band_sum(path, 0, 33, PartOne.band_values), 467 + 35 + 633)
+        self.assertEqual(_band_sum(path, 33, 77, PartOne.band_values), 617 + 592)
+        self.assertEqual(
+            _band_sum(path, 77, path.stat().st_size, PartOne.band_values),
+            755 + 664 + 598,
+        )
+
+    def test_sample_parallel(self):
+        found_solution = PartOne("sample.txt").solve_parallel(2, band_size=20)
+        self.assertEqual(found_solution, 4361)
+
+    def test_solve_parallel(self):
+        found_solution = PartOne("input.txt").solve_parallel(4, band_size=1000)
+        self.assertEqual(found_solution, 540025)
+
     def test_solve(self):
         found_solution = PartOne("input.txt").solve()
         self.assertEqual(found_solution, 540025)
@@ -157,47 +378,103 @@ class PartTwo:
 
         @classmethod
         def parse_lines(cls, lines: list[str]) -> list[Self]:
+            index = PartTwo.NumberIndex.from_lines(lines)
+            return cls.from_lines_index(lines, index)
+
+        @classmethod
+        def from_lines_index(
+            cls, lines: list[str], index: "PartTwo.NumberIndex"
+        ) -> list[Self]:
             found = []
             for line_idx, line in enumerate(lines):
-                # print(line)
                 for match in re.finditer(r"(\*)", line):
-                    # print(f"{match.start(0)=}")
-                    part_numbers = cls._find_numbers(line, match.start(0))
-                    if line_idx > 0:
-                        part_numbers.extend(
-                            cls._find_numbers(lines[line_idx - 1], match.start(0))
-                        )
-                    try:
-                        part_numbers.extend(
-                            cls._find_numbers(lines[line_idx + 1], match.start(0))
-                        )
-                    except IndexError:
-                        pass
-
-                    # print(part_numbers)
-                    if len(part_numbers) == 2:
-                        found.append(cls(tuple(part_numbers)))
+                    gear = cls.from_index(index, line_idx, match.start(0))
+                    if gear is not None:
+                        found.append(gear)
             return found
 
-        @staticmethod
-        def _find_numbers(line: str, column: int) -> list[int]:
-            output = []
-            # print(f"Looking {line=}")
+        @classmethod
+        def from_index(
+            cls, index: "PartTwo.NumberIndex", row: int, column: int
+        ) -> Self | None:
+            part_numbers = [
+                *index.touching(row, column),
+                *index.touching(row - 1, column),
+                *index.touching(row + 1, column),
+            ]
+            if len(part_numbers) == 2:
+                return cls(tuple(part_numbers))
+            return None
+
+    @dataclass(frozen=True)
+    class NumberIndex:
+        starts: list[list[int]]
+        ends: list[list[int]]
+        values: list[list[int]]
+
+        @classmethod
+        def from_numbers(cls, numbers: list[PartOne.Number], rows: int) -> Self:
+            index = cls(
+                starts=[[] for _ in range(rows)],
+                ends=[[] for _ in range(rows)],
+                values=[[] for _ in range(rows)],
+            )
+            # parse_lines yields numbers row by row, left to right
+            for number in numbers:
+                index.starts[number.row].append(number.column)
+                index.ends[number.row].append(number.column + number.length)
+                index.values[number.row].append(number.value)
+            return index
 
-            for match in re.finditer(r"\d+", line):
-                if match.start(0) - 1 <= column <= match.end(0):
-                    output.append(int(match.group(0)))
+        @classmethod
+        def from_lines(cls, lines: list[str]) -> Self:
+            return cls.from_numbers(PartOne.Number.parse_lines(lines), len(lines))
 
-            return output
+        def touching(self, row: int, column: int) -> list[int]:
+            if not 0 <= row < len(self.values):
+                return []
+            first = bisect_left(self.ends[row], column)
+            last = bisect_right(self.starts[row], column + 1)
+            return self.values[row][first:last]
 
     def __init__(self, file_name: str) -> None:
         self.file_name = file_name
 
-    def solve(self) -> int:
+    def parse(self) -> tuple[list[str], NumberIndex]:
         lines = read_file(self.file_name)
-        gears = PartTwo.Gear.parse_lines(lines)
+        return lines, PartTwo.NumberIndex.from_lines(lines)
+
+    def solve(self) -> int:
+        return self.solve_parsed(self.parse())
+
+    def solve_parsed(self, parsed: tuple[list[str], NumberIndex]) -> int:
+        gears = PartTwo.Gear.from_lines_index(*parsed)
         return sum(gear.get_ratio() for gear in gears)
 
+    @staticmethod
+    def band_values(lines: list[str], first: int, last: int) -> list[int]:
+        index = PartTwo.NumberIndex.from_lines(lines)
+        gears = (
+            PartTwo.Gear.from_index(index, row, match.start(0))
+            for row in range(first, last)
+            for match in re.finditer(r"(\*)", lines[row])
+        )
+        return [gear.get_ratio() for gear in gears if gear is not None]
+
+    @classmethod
+    def stream(cls, lines: Iterable[str], rows: int = 1024) -> Iterator[int]:
+        for band, first, last in bands(lines, rows):
+            yield from cls.band_values(band, first, last)
+
+    @classmethod
+    def solve_stream(cls, lines: Iterable[str]) -> int:
+        return sum(cls.stream(lines))
+
+    def solve_parallel(
+        self, workers: int | None = None, band_size: int = 16 * 1024 * 1024
+    ) -> int:
+        return solve_parallel(self.file_name, self.band_values, workers, band_size)
+
 
 class PartTwoTestCase(unittest.TestCase):
     def test_gear_parse_single_line(self):
@@ -240,6 +517,27 @@ class PartTwoTestCase(unittest.TestCase):
             self.assertEqual(len(gears), 1)
             self.assertEqual(gears[0].part_numbers, (467, 35))
 
+    def test_number_index(self):
+        lines = [
+            "467..114..",
+            "...*......",
+            "..35..633.",
+            "12.3......",
+        ]
+        index = PartTwo.NumberIndex.from_numbers(
+            PartOne.Number.parse_lines(lines), len(lines)
+        )
+        self.assertEqual(index.touching(0, 3), [467])
+        self.assertEqual(index.touching(0, 4), [114])
+        self.assertEqual(index.touching(0, 8), [114])
+        self.assertEqual(index.touching(0, 9), [])
+        self.assertEqual(index.touching(1, 3), [])
+        self.assertEqual(index.touching(2, 4), [35])
+        self.assertEqual(index.touching(2, 5), [633])
+        self.assertEqual(index.touching(-1, 3), [])
+        self.assertEqual(index.touching(3, 2), [12, 3])
+        self.assertEqual(index.touching(4, 3), [])
+
     def test_sample_ratios(self):
         lines = read_file("sample.txt")
         gears = PartTwo.Gear.parse_lines(lines)
@@ -249,10 +547,28 @@ class PartTwoTestCase(unittest.TestCase):
         self.assertEqual(gears[0].get_ratio(), 16345)
         self.assertEqual(gears[1].get_ratio(), 451490)
 
+    def test_stream(self):
+        for rows in (1, 2, 3, 1024):
+            with (Path(__file__).parent / "sample.txt").open() as f:
+                self.assertEqual(list(PartTwo.stream(f, rows)), [16345, 451490])
+
     def test_sample(self):
         found_solution = PartTwo("sample.txt").solve()
         self.assertEqual(found_solution, 467835)
 
+    def test_solve_stream(self):
+        with (Path(__file__).parent / "input.txt").open() as f:
+            self.assertEqual(PartTwo.solve_stream(f), 84584891)
+
+    def test_sample_parallel(self):
+        for band_size in (1, 11, 20, 50, 1000):
+            found_solution = PartTwo("sample.txt").solve_parallel(2, band_size)
+            self.assertEqual(found_solution, 467835, band_size)
+
+    def test_solve_parallel(self):
+        found_solution = PartTwo("input.txt").solve_parallel(4, band_size=1000)
+        self.assertEqual(found_solution, 84584891)
+
     def test_solve(self):
         found_solution = PartTwo("input.txt").solve()
         self.assertEqual(found_solution, 84584891)
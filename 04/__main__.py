@@ -1,6 +1,9 @@
+import functools
+import operator
 import re
 import unittest
-from collections import defaultdict
+from array import array
+from collections.abc import Iterable
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Self
@@ -28,7 +31,7 @@ class PartOne:
                 having=set(map(int, re.findall(r"\d+", line_match.group(3)))),
             )
 
-        @property
+        @functools.cached_property
         def matching(self) -> int:
             return len(self.winning.intersection(self.having))
 
@@ -38,13 +41,50 @@ class PartOne:
                 return 2 ** (self.matching - 1)
             return 0
 
+    @dataclass(frozen=True)
+    class Deck:
+        ids: array
+        winning: list[int]
+        having: list[int]
+
+        @classmethod
+        def from_lines(cls, lines: Iterable[str]) -> Self:
+            deck = cls(ids=array("L"), winning=[], having=[])
+            for line in lines:
+                line_match = re.fullmatch(r"Card\s+(\d+): ([\d\s]+) \| ([\d\s]+)", line)
+                assert line_match
+                deck.ids.append(int(line_match.group(1)))
+                deck.winning.append(cls.mask(line_match.group(2)))
+                deck.having.append(cls.mask(line_match.group(3)))
+            return deck
+
+        @staticmethod
+        def mask(numbers: str) -> int:
+            return functools.reduce(
+                operator.or_, (1 << int(number) for number in numbers.split()), 0
+            )
+
+        def matching(self) -> list[int]:
+            return [
+                (winning & having).bit_count()
+                for winning, having in zip(self.winning, self.having)
+            ]
+
+        def points(self) -> list[int]:
+            return [1 << matching >> 1 for matching in self.matching()]
+
     def __init__(self, file_name: str) -> None:
         self.file_name = file_name
 
-    def solve(self) -> int:
+    def parse(self) -> Deck:
         lines = read_file(self.file_name)
-        cards = [PartOne.Card.from_line(line) for line in lines]
-        return sum(card.points for card in cards)
+        return PartOne.Deck.from_lines(lines)
+
+    def solve(self) -> int:
+        return self.solve_parsed(self.parse())
+
+    def solve_parsed(self, deck: Deck) -> int:
+        return sum(deck.points())
 
 
 class PartOneTestCase(unittest.TestCase):
@@ -73,6 +113,25 @@ class PartOneTestCase(unittest.TestCase):
         self.assertEqual(losing_card.matching, 0)
         self.assertEqual(losing_card.points, 0)
 
+    def test_parse_deck(self):
+        deck = PartOne.Deck.from_lines(
+            [
+                "Card 1: 41 48 83 86 17 | 83 86  6 31 17  9 48 53",
+                "Card 6: 31 18 13 56 72 | 74 77 10 23 35 67 36 11",
+            ]
+        )
+        self.assertEqual(list(deck.ids), [1, 6])
+        self.assertEqual(deck.winning[0], sum(1 << n for n in (41, 48, 83, 86, 17)))
+        self.assertEqual(deck.matching(), [4, 0])
+        self.assertEqual(deck.points(), [8, 0])
+
+    def test_deck_matches_cards(self):
+        lines = read_file("input.txt")
+        deck = PartOne.Deck.from_lines(lines)
+        cards = [PartOne.Card.from_line(line) for line in lines]
+        self.assertEqual(deck.matching(), [card.matching for card in cards])
+        self.assertEqual(deck.points(), [card.points for card in cards])
+
     def test_sample(self):
         found_solution = PartOne("sample.txt").solve()
         self.assertEqual(found_solution, 13)
@@ -83,23 +142,83 @@ class PartOneTestCase(unittest.TestCase):
 
 
 class PartTwo:
+    class Cascade:
+        def __init__(self, window: int = 0) -> None:
+            # Ring buffer of copy differences for the next window + 1 cards.
+            self.pending = [0] * (window + 2)
+            self.position = 0
+            self.running = 0
+            self.total = 0
+
+        @property
+        def window(self) -> int:
+            return len(self.pending) - 2
+
+        def push(self, matching: int) -> int:
+            if matching > self.window:
+                self._grow(matching)
+            size = len(self.pending)
+            slot = self.position % size
+            self.running += self.pending[slot]
+            self.pending[slot] = 0
+
+            copies = self.running + 1
+            if matching > 0:
+                self.pending[(slot + 1) % size] += copies
+                self.pending[(slot + matching + 1) % size] -= copies
+            self.position += 1
+            self.total += copies
+            return copies
+
+        def _grow(self, window: int) -> None:
+            size = len(self.pending)
+            start = self.position % size
+            self.pending = (
+                self.pending[start:] + self.pending[:start] + [0] * (window + 2 - size)
+            )
+            self.position = 0
+
     def __init__(self, file_name: str) -> None:
         self.file_name = file_name
 
-    def solve(self) -> int:
-        lines = read_file(self.file_name)
-        cards = [PartOne.Card.from_line(line) for line in lines]
+    def parse(self) -> PartOne.Deck:
+        return PartOne(self.file_name).parse()
 
-        card_quantities = defaultdict(lambda: 1)
-        for card in cards:
-            current_copies = card_quantities[card.id]
-            for id_delta in range(card.matching):
-                card_quantities[card.id + id_delta + 1] += current_copies
+    def solve(self) -> int:
+        return self.solve_parsed(self.parse())
 
-        return sum(card_quantities.values())
+    def solve_parsed(self, deck: PartOne.Deck) -> int:
+        cascade = PartTwo.Cascade()
+        for matching in deck.matching():
+            cascade.push(matching)
+        return cascade.total
 
 
 class PartTwoTestCase(unittest.TestCase):
+    def test_cascade(self):
+        cascade = PartTwo.Cascade(4)
+        copies = [cascade.push(matching) for matching in [4, 2, 2, 1, 0, 0]]
+        self.assertEqual(copies, [1, 2, 4, 8, 14, 1])
+        self.assertEqual(cascade.total, 30)
+
+    def test_cascade_grow(self):
+        cascade = PartTwo.Cascade()
+        copies = [cascade.push(matching) for matching in [1, 0, 2, 4, 2, 2, 1, 0, 0]]
+        self.assertEqual(copies, [1, 2, 1, 2, 4, 7, 14, 24, 1])
+        self.assertEqual(cascade.window, 4)
+        self.assertEqual(cascade.total, 56)
+
+    def test_cascade_exact(self):
+        cascade = PartTwo.Cascade()
+        for _ in range(200):
+            cascade.push(1)
+        self.assertEqual(cascade.total, 200 * 201 // 2)
+
+        cascade = PartTwo.Cascade()
+        for matching in range(100, -1, -1):
+            cascade.push(matching)
+        self.assertEqual(cascade.total, 2**101 - 1)
+
     def test_sample(self):
         found_solution = PartTwo("sample.txt").solve()
         self.assertEqual(found_solution, 30)
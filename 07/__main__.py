@@ -1,7 +1,18 @@
+import contextlib
+import functools
+import hashlib
+import heapq
+import operator
+import os
 import re
+import struct
+import tempfile
 import unittest
-from collections import Counter
+from array import array
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
+from itertools import combinations_with_replacement, count, product
 from pathlib import Path
 from typing import Self
 
@@ -11,18 +22,155 @@ def read_file(file_name: str) -> list[str]:
         return [line.strip() for line in f.readlines()]
 
 
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+# bump when classify() or the table layout changes, so old cache files are
+# no longer picked up
+CACHE_VERSION = 1
+
+RECORD = struct.Struct("<QQQ")
+
+
+@dataclass(frozen=True)
+class Ruleset:
+    # strongest card first
+    cards_order: str
+    # cards that join whichever card the hand holds most of
+    wildcards: str = ""
+    # groups of two or more equal cards, strongest type first; hands that
+    # match none of them fall into the last one
+    types: tuple[tuple[int, ...], ...] = ((5,), (4,), (2, 3), (3,), (2, 2), (2,), ())
+
+    def count_cards(self, cards: str) -> dict[str, int]:
+        raw_count = Counter(card for card in cards if card not in self.wildcards)
+        if jokers := len(cards) - raw_count.total():
+            try:
+                best_card, best_card_count = raw_count.most_common(1)[0]
+            except IndexError:
+                best_card, best_card_count = self.cards_order[0], 0
+            raw_count[best_card] = best_card_count + jokers
+        return {card: count for card, count in raw_count.items() if count >= 2}
+
+    def classify(self, cards: str) -> int:
+        groups = tuple(sorted(self.count_cards(cards).values()))
+        try:
+            return self.types.index(groups)
+        except ValueError:
+            return len(self.types) - 1
+
+    def compile(self, cache_dir: Path | None = CACHE_DIR) -> "CompiledRuleset":
+        return CompiledRuleset.build(self, cache_dir)
+
+
+@dataclass(frozen=True)
+class CompiledRuleset:
+    cards: str
+    base: int
+    types: int
+    digits: dict[int, str]
+    type_table: array
+
+    @property
+    def key_space(self) -> int:
+        return self.types * self.base**5
+
+    @classmethod
+    @functools.cache
+    def build(cls, ruleset: Ruleset, cache_dir: Path | None) -> Self:
+        base = len(ruleset.cards_order)
+        digits = str.maketrans(
+            {card: DIGITS[value] for value, card in enumerate(ruleset.cards_order)}
+        )
+
+        cache_file = None
+        if cache_dir is not None:
+            cache_key = f"{CACHE_VERSION}:{ruleset!r}"
+            digest = hashlib.sha256(cache_key.encode()).hexdigest()
+            cache_file = cache_dir / f"ruleset-{digest[:32]}.bin"
+
+        type_table = array("B")
+        if cache_file is not None:
+            with contextlib.suppress(OSError):
+                type_table.frombytes(cache_file.read_bytes())
+
+        if len(type_table) != base**5 or max(type_table) >= len(ruleset.types):
+            # The type only depends on which cards a hand holds, so classify
+            # every multiset once and spread it over all the orderings.
+            multiset_types = {
+                values: ruleset.classify(
+                    "".join(ruleset.cards_order[value] for value in values)
+                )
+                for values in combinations_with_replacement(range(base), 5)
+            }
+            type_table = array(
+                "B",
+                (
+                    multiset_types[tuple(sorted(values))]
+                    for values in product(range(base), repeat=5)
+                ),
+            )
+            if cache_file is not None:
+                partial_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+                try:
+                    cache_file.parent.mkdir(parents=True, exist_ok=True)
+                    partial_file.write_bytes(type_table.tobytes())
+                    partial_file.replace(cache_file)
+                except OSError:
+                    # the cache is only a shortcut, a read-only tree goes
+                    # without it
+                    with contextlib.suppress(OSError):
+                        partial_file.unlink(missing_ok=True)
+
+        return cls(
+            cards=ruleset.cards_order,
+            base=base,
+            types=len(ruleset.types),
+            digits=digits,
+            type_table=type_table,
+        )
+
+    def key_of(self, cards: str) -> int:
+        # Unknown cards would pass through translate() and could still read
+        # as digits; nothing is left once every known card is stripped.
+        if len(cards) != 5 or cards.strip(self.cards):
+            raise ValueError(f"not a hand: {cards!r}")
+        # cards read as a base-N number, most significant card first
+        packed = int(cards.translate(self.digits), self.base)
+        return self.type_table[packed] * self.base**5 + packed
+
+
+def spill_run(run: list[tuple[int, int, int]], path: Path) -> Path:
+    # weakest hand first, like the merge that reads it back
+    run.sort(reverse=True)
+    with path.open("wb") as f:
+        for start in range(0, len(run), 4096):
+            f.write(
+                b"".join(RECORD.pack(*record) for record in run[start : start + 4096])
+            )
+    return path
+
+
+def read_run(path: Path, block_size: int) -> Iterator[tuple[int, int, int]]:
+    block_size -= block_size % RECORD.size
+    with path.open("rb") as f:
+        while block := f.read(block_size):
+            yield from RECORD.iter_unpack(block)
+
+
 class PartOne:
     @dataclass(frozen=True)
     class Hand:
         cards: str
         bid: int
 
-        CARDS_ORDER = ["A", "K", "Q", "J", "T", "9", "8", "7", "6", "5", "4", "3", "2"]
+        RULESET = Ruleset(cards_order="AKQJT98765432")
 
         @classmethod
         def from_line(cls, line: str) -> Self:
             line_match = re.fullmatch(
-                r"([" + "".join(cls.CARDS_ORDER) + r"]{5}) (\d+)", line
+                r"([" + cls.RULESET.cards_order + r"]{5}) (\d+)", line
             )
             assert line_match
             return cls(
@@ -32,41 +180,58 @@ class PartOne:
 
         @property
         def count_cards(self) -> dict[str, int]:
-            return {
-                card: count for card, count in Counter(self.cards).items() if count >= 2
-            }
+            return self.RULESET.count_cards(self.cards)
 
         @property
         def type(self) -> int:
-            match sorted(self.count_cards.values()):
-                case [5]:
-                    return 0
-                case [4]:
-                    return 1
-                case [2, 3]:
-                    return 2
-                case [3]:
-                    return 3
-                case [2, 2]:
-                    return 4
-                case [2]:
-                    return 5
-                case _:
-                    return 6
+            return self.RULESET.classify(self.cards)
 
         def nth_card_value(self, index: int) -> int:
-            return self.CARDS_ORDER.index(self.cards[index])
+            return self.RULESET.cards_order.index(self.cards[index])
+
+        @classmethod
+        def compiled(cls) -> CompiledRuleset:
+            # Kept on each Hand class after the first call, so that keys
+            # don't pay for hashing the ruleset into the compile cache.
+            compiled = cls.__dict__.get("_compiled")
+            if compiled is None:
+                compiled = cls._compiled = cls.RULESET.compile()
+            return compiled
+
+        @classmethod
+        def key_of(cls, cards: str) -> int:
+            return cls.compiled().key_of(cards)
 
         def sort_key(self) -> int:
-            factors = [
-                self.type * len(self.CARDS_ORDER) ** 5,
-                self.nth_card_value(0) * len(self.CARDS_ORDER) ** 4,
-                self.nth_card_value(1) * len(self.CARDS_ORDER) ** 3,
-                self.nth_card_value(2) * len(self.CARDS_ORDER) ** 2,
-                self.nth_card_value(3) * len(self.CARDS_ORDER) ** 1,
-                self.nth_card_value(4) * len(self.CARDS_ORDER) ** 0,
-            ]
-            return sum(factors)
+            return self.key_of(self.cards)
+
+    @dataclass(frozen=True)
+    class Table:
+        keys: array
+        bids: array
+
+        @classmethod
+        def from_lines(cls, lines: Iterable[str], hand: type["PartOne.Hand"]) -> Self:
+            table = cls(keys=array("L"), bids=array("Q"))
+            compiled = hand.compiled()
+            for line in lines:
+                cards, bid = line.split()
+                table.keys.append(compiled.key_of(cards))
+                table.bids.append(int(bid))
+            return table
+
+        def total_winnings(self) -> int:
+            # Sort plain integers carrying the line index in their low bits:
+            # the weakest hand has the highest key and comes first, and of two
+            # identical hands the later one ranks lower.
+            shift = len(self.keys).bit_length()
+            records = sorted(
+                (key << shift | index for index, key in enumerate(self.keys)),
+                reverse=True,
+            )
+            index_mask = (1 << shift) - 1
+            bids = (self.bids[record & index_mask] for record in records)
+            return sum(map(operator.mul, count(1), bids))
 
     def __init__(self, file_name: str) -> None:
         self.file_name = file_name
@@ -75,11 +240,44 @@ class PartOne:
         lines = read_file(self.file_name)
         return [self.Hand.from_line(line) for line in lines]
 
-    def solve(self) -> int:
-        hands = self.parse_input()
-        sorted_hands = reversed(sorted(hands, key=self.Hand.sort_key))
+    def parse_table(self) -> Table:
+        lines = read_file(self.file_name)
+        return self.Table.from_lines(lines, self.Hand)
 
-        return sum((i + 1) * hand.bid for i, hand in enumerate(sorted_hands))
+    def parse(self) -> Table:
+        return self.parse_table()
+
+    def solve(self) -> int:
+        return self.solve_parsed(self.parse())
+
+    def solve_parsed(self, table: Table) -> int:
+        return table.total_winnings()
+
+    def solve_external(
+        self, memory_budget: int = 64 * 1024 * 1024, temp_dir: str | None = None
+    ) -> int:
+        # A (key, index, bid) tuple costs about this much once it sits in a list.
+        run_length = max(memory_budget // 160, 1)
+        with tempfile.TemporaryDirectory(dir=temp_dir) as directory:
+            runs = []
+            run: list[tuple[int, int, int]] = []
+            compiled = self.Hand.compiled()
+            with (Path(__file__).parent / self.file_name).open() as f:
+                for index, line in enumerate(f):
+                    cards, bid = line.split()
+                    run.append((compiled.key_of(cards), index, int(bid)))
+                    if len(run) == run_length:
+                        runs.append(spill_run(run, Path(directory) / f"{len(runs)}"))
+                        run = []
+            if run:
+                runs.append(spill_run(run, Path(directory) / f"{len(runs)}"))
+            del run
+
+            block_size = max(memory_budget // max(len(runs), 1), RECORD.size)
+            merged = heapq.merge(
+                *(read_run(path, block_size) for path in runs), reverse=True
+            )
+            return sum(rank * bid for rank, (_, _, bid) in enumerate(merged, 1))
 
 
 class PartOneTestCase(unittest.TestCase):
@@ -130,6 +328,38 @@ class PartOneTestCase(unittest.TestCase):
         self.assertEqual(hand.type, 6)
         self.assertEqual(hand.nth_card_value(0), 12)
 
+    def test_hand_sort_key(self):
+        def slow_sort_key(hand: PartOne.Hand) -> int:
+            factors = [hand.type] + [hand.nth_card_value(i) for i in range(5)]
+            return sum(factor * 13 ** (5 - i) for i, factor in enumerate(factors))
+
+        for hand in PartOne("input.txt").parse_input():
+            self.assertEqual(hand.sort_key(), slow_sort_key(hand))
+            joker_hand = PartTwo.Hand(hand.cards, hand.bid)
+            self.assertEqual(joker_hand.sort_key(), slow_sort_key(joker_hand))
+
+    def test_type_table(self):
+        table = PartOne.Hand.RULESET.compile().type_table
+        self.assertEqual(len(table), 13**5)
+        self.assertEqual(table[0], 0)
+        self.assertEqual(table[int("00001", 13)], 1)
+        self.assertEqual(table[int("01234", 13)], 6)
+        table = PartTwo.Hand.RULESET.compile().type_table
+        self.assertEqual(table[int("0cccc", 13)], 0)
+
+    def test_key_of_invalid(self):
+        for cards in ("BBBBB", "11111", "aaaaa", "3333", "333333", "X3333"):
+            with self.assertRaises(ValueError):
+                PartOne.Hand(cards, 1).sort_key()
+        with self.assertRaises(ValueError):
+            Ranker(PartOne.Hand).add(PartOne.Hand("BBBBB", 1))
+
+    def test_compiled_per_class(self):
+        self.assertIs(PartOne.Hand.compiled(), PartOne.Hand.compiled())
+        self.assertEqual(PartOne.Hand.compiled(), PartOne.Hand.RULESET.compile())
+        self.assertEqual(PartTwo.Hand.compiled(), PartTwo.Hand.RULESET.compile())
+        self.assertIsNot(PartOne.Hand.compiled(), PartTwo.Hand.compiled())
+
     def test_hand_sort(self):
         hands = PartOne("sample.txt").parse_input()
         sorted_hands = sorted(hands, key=PartOne.Hand.sort_key)
@@ -139,10 +369,61 @@ class PartOneTestCase(unittest.TestCase):
         self.assertEqual(sorted_hands[3].cards, "KTJJT")
         self.assertEqual(sorted_hands[4].cards, "32T3K")
 
+    def test_parse_table(self):
+        table = PartOne("sample.txt").parse_table()
+        hands = PartOne("sample.txt").parse_input()
+        self.assertEqual(list(table.keys), [hand.sort_key() for hand in hands])
+        self.assertEqual(list(table.bids), [765, 684, 28, 220, 483])
+
+    def test_total_winnings(self):
+        table = PartOne.Table(keys=array("L", [3, 1, 2]), bids=array("Q", [5, 7, 0]))
+        self.assertEqual(table.total_winnings(), 1 * 5 + 2 * 0 + 3 * 7)
+        table = PartOne.Table(keys=array("L"), bids=array("Q"))
+        self.assertEqual(table.total_winnings(), 0)
+
+    def test_total_winnings_ties(self):
+        # identical hands keep their input order, the later one ranks lower
+        table = PartOne.Table(keys=array("L", [1, 1, 2]), bids=array("Q", [5, 7, 3]))
+        self.assertEqual(table.total_winnings(), 1 * 3 + 2 * 7 + 3 * 5)
+        lines = ["AAAAA 5", "23456 3", "AAAAA 7"]
+        self.assertEqual(
+            PartOne.Table.from_lines(lines, PartOne.Hand).total_winnings(),
+            1 * 3 + 2 * 7 + 3 * 5,
+        )
+
+    def test_parse_table_invalid(self):
+        for line in ("11111 5", "abcab 2", "AAAA 1", "AAAAAA 1"):
+            with self.assertRaises(ValueError):
+                PartOne.Table.from_lines([line], PartOne.Hand)
+
+    def test_spill_read_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            run = [(1, 0, 10), (3, 1, 30), (1, 2, 20)]
+            path = spill_run(run, Path(directory) / "run")
+            self.assertEqual(path.stat().st_size, 3 * RECORD.size)
+            self.assertEqual(
+                list(read_run(path, RECORD.size * 2)),
+                [(3, 1, 30), (1, 2, 20), (1, 0, 10)],
+            )
+
     def test_sample(self):
         found_solution = PartOne("sample.txt").solve()
         self.assertEqual(found_solution, 6440)
 
+    def test_sample_external(self):
+        found_solution = PartOne("sample.txt").solve_external(memory_budget=256)
+        self.assertEqual(found_solution, 6440)
+
+    def test_external_ties(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "ties.txt"
+            path.write_text("AAAAA 5\n23456 3\nAAAAA 7\n")
+            found_solution = PartOne(str(path)).solve_external(memory_budget=160)
+            self.assertEqual(found_solution, 1 * 3 + 2 * 7 + 3 * 5)
+            path.write_text("AAAAA 5\n1AAAA 3\n")
+            with self.assertRaises(ValueError):
+                PartOne(str(path)).solve_external()
+
     def test_solve(self):
         found_solution = PartOne("input.txt").solve()
         self.assertEqual(found_solution, 251545216)
@@ -150,22 +431,7 @@ class PartOneTestCase(unittest.TestCase):
 
 class PartTwo(PartOne):
     class Hand(PartOne.Hand):
-        CARDS_ORDER = ["A", "K", "Q", "T", "9", "8", "7", "6", "5", "4", "3", "2", "J"]
-
-        @property
-        def count_cards(self) -> dict[str, int]:
-            raw_count = Counter(self.cards)
-
-            jokers = raw_count.pop("J") if "J" in raw_count else 0
-            try:
-                best_card, best_card_count = raw_count.most_common(1)[0]
-            except IndexError:
-                best_card = self.CARDS_ORDER[0]
-                best_card_count = 0
-
-            raw_count[best_card] = best_card_count + jokers
-
-            return {card: count for card, count in raw_count.items() if count >= 2}
+        RULESET = Ruleset(cards_order="AKQT98765432J", wildcards="J")
 
 
 class PartTwoTestCase(unittest.TestCase):
@@ -177,6 +443,278 @@ class PartTwoTestCase(unittest.TestCase):
         found_solution = PartTwo("input.txt").solve()
         self.assertEqual(found_solution, 250384185)
 
+    def test_solve_external(self):
+        for memory_budget in (2_000, 10_000, 1_000_000):
+            found_solution = PartTwo("input.txt").solve_external(memory_budget)
+            self.assertEqual(found_solution, 250384185)
+
+
+class BidTree:
+    # Fenwick trees of hand counts and bid sums over positions 0..size-1,
+    # growing when a position past the end is updated
+    def __init__(self, size: int = 0) -> None:
+        self.size = size
+        self.counts = [0] * (size + 1)
+        self.bid_sums = [0] * (size + 1)
+
+    def update(self, position: int, count: int, bid: int) -> None:
+        if position >= self.size:
+            self._grow(max(2 * self.size, position + 1))
+        index = position + 1
+        while index <= self.size:
+            self.counts[index] += count
+            self.bid_sums[index] += bid
+            index += index & -index
+
+    def prefix(self, position: int) -> tuple[int, int]:
+        # number and bids of the hands before position
+        count = bids = 0
+        index = min(position, self.size)
+        while index > 0:
+            count += self.counts[index]
+            bids += self.bid_sums[index]
+            index -= index & -index
+        return count, bids
+
+    def _grow(self, size: int) -> None:
+        # New nodes only cover old positions when their range starts before
+        # the old end, and the positions past it are all empty.
+        old_size = self.size
+        for index in range(old_size + 1, size + 1):
+            start = index - (index & -index)
+            if start < old_size:
+                count, bids = self.prefix(old_size)
+                start_count, start_bids = self.prefix(start)
+                self.counts.append(count - start_count)
+                self.bid_sums.append(bids - start_bids)
+            else:
+                self.counts.append(0)
+                self.bid_sums.append(0)
+        self.size = size
+
+
+class Ranker:
+    def __init__(self, hand: type[PartOne.Hand]) -> None:
+        self.hand = hand
+        self.keys = BidTree(hand.compiled().key_space)
+        # Identical hands get increasing positions in a tree of their own as
+        # they are added; like Table, the later one ranks lower.
+        self.ties: dict[int, BidTree] = {}
+        self.next_position: dict[int, int] = {}
+        # positions of the live hands, by key and then by bid
+        self.positions: dict[int, dict[int, deque[int]]] = {}
+        self.live: dict[int, int] = {}
+        self.hands = 0
+        self.winnings = 0
+
+    def add(self, hand: PartOne.Hand) -> None:
+        key = hand.sort_key()
+        position = self.next_position.get(key, 0)
+        self.next_position[key] = position + 1
+        ties = self.ties.setdefault(key, BidTree())
+        self.winnings += self._contribution(key, hand.bid, position)
+        self.keys.update(key, 1, hand.bid)
+        ties.update(position, 1, hand.bid)
+        self.positions.setdefault(key, {}).setdefault(hand.bid, deque()).append(
+            position
+        )
+        self.live[key] = self.live.get(key, 0) + 1
+        self.hands += 1
+
+    def remove(self, hand: PartOne.Hand) -> None:
+        key = hand.sort_key()
+        # of identical hands with the same bid, the earliest added goes first
+        bids = self.positions.get(key, {})
+        positions = bids.get(hand.bid)
+        if not positions:
+            raise ValueError(f"{hand} is not ranked")
+        position = positions.popleft()
+        if not positions:
+            del bids[hand.bid]
+        self.keys.update(key, -1, -hand.bid)
+        self.ties[key].update(position, -1, -hand.bid)
+        self.hands -= 1
+        self.winnings -= self._contribution(key, hand.bid, position)
+
+        self.live[key] -= 1
+        if not self.live[key]:
+            del self.ties[key], self.next_position[key]
+            del self.positions[key], self.live[key]
+        elif self.next_position[key] > 2 * self.live[key]:
+            self._compact(key)
+
+    def _compact(self, key: int) -> None:
+        # Number the live identical hands from 0 again, in the same order, so
+        # that a key's tree follows its live hands rather than its history.
+        live = sorted(
+            (position, bid)
+            for bid, positions in self.positions[key].items()
+            for position in positions
+        )
+        ties = BidTree(len(live))
+        bids: dict[int, deque[int]] = {}
+        for position, (_, bid) in enumerate(live):
+            ties.update(position, 1, bid)
+            bids.setdefault(bid, deque()).append(position)
+        self.ties[key] = ties
+        self.positions[key] = bids
+        self.next_position[key] = len(live)
+
+    def total(self) -> int:
+        return self.winnings
+
+    def _contribution(self, key: int, bid: int, position: int) -> int:
+        # What a new hand adds: its own rank times its bid, plus one more
+        # unit of every stronger hand's bid as they all move up a rank.
+        # Hands with a lower key are stronger, and so are identical hands
+        # added before it.
+        stronger_count, stronger_bids = self.keys.prefix(key)
+        tie_count, tie_bids = self.ties[key].prefix(position)
+        weaker = self.hands - stronger_count - tie_count
+        return (weaker + 1) * bid + stronger_bids + tie_bids
+
+
+class RulesetTestCase(unittest.TestCase):
+    def test_count_cards(self):
+        ruleset = Ruleset(cards_order="AKQT98765432J", wildcards="J")
+        self.assertEqual(ruleset.count_cards("KTJJT"), {"T": 4})
+        self.assertEqual(ruleset.count_cards("JJJJJ"), {"A": 5})
+        self.assertEqual(ruleset.count_cards("2345J"), {"2": 2})
+        self.assertEqual(ruleset.count_cards("23456"), {})
+
+    def test_multiple_wildcards(self):
+        ruleset = Ruleset(cards_order="AKT98765432QJ", wildcards="QJ")
+        self.assertEqual(ruleset.classify("2QJ34"), 3)
+        self.assertEqual(ruleset.classify("22QJ3"), 1)
+        self.assertEqual(ruleset.classify("QQJJA"), 0)
+
+    def test_type_hierarchy(self):
+        # two pairs beat three of a kind, unlisted full houses rank last
+        ruleset = Ruleset(
+            cards_order="AKQJT98765432",
+            types=((5,), (4,), (2, 2), (3,), (2,), ()),
+        )
+        self.assertEqual(ruleset.classify("22334"), 2)
+        self.assertEqual(ruleset.classify("22234"), 3)
+        self.assertEqual(ruleset.classify("22233"), 5)
+        compiled = ruleset.compile(cache_dir=None)
+        self.assertEqual(compiled.key_space, 6 * 13**5)
+        self.assertLess(compiled.key_of("22334"), compiled.key_of("22234"))
+
+    def test_compile_cache(self):
+        ruleset = Ruleset(cards_order="AK2", wildcards="2")
+        with tempfile.TemporaryDirectory() as directory:
+            compiled = ruleset.compile(Path(directory))
+            self.assertEqual(len(compiled.type_table), 3**5)
+            self.assertEqual(len(list(Path(directory).iterdir())), 1)
+
+            CompiledRuleset.build.cache_clear()
+            cached = ruleset.compile(Path(directory))
+            self.assertIsNot(cached, compiled)
+            self.assertEqual(cached, compiled)
+            self.assertEqual(cached.key_of("A2K2A"), 1 * 3**5 + int("02120", 3))
+
+    def test_compile_cache_unwritable(self):
+        ruleset = Ruleset(cards_order="AK3", wildcards="3")
+        with tempfile.TemporaryDirectory() as directory:
+            # a file where the cache directory should be
+            blocked = Path(directory) / "blocked"
+            blocked.write_text("")
+            compiled = ruleset.compile(blocked)
+            self.assertEqual(compiled, ruleset.compile(cache_dir=None))
+            self.assertEqual(list(Path(directory).iterdir()), [blocked])
+
+
+class RankerTestCase(unittest.TestCase):
+    def test_sample(self):
+        ranker = Ranker(PartOne.Hand)
+        for hand in PartOne("sample.txt").parse_input():
+            ranker.add(hand)
+        self.assertEqual(ranker.total(), 6440)
+
+    def test_add_remove(self):
+        for part in (PartOne, PartTwo):
+            hands = part("input.txt").parse_input()
+            ranker = Ranker(part.Hand)
+            for hand in hands:
+                ranker.add(hand)
+            self.assertEqual(ranker.total(), part("input.txt").solve())
+
+            for hand in hands[::2]:
+                ranker.remove(hand)
+            table = part.Table(
+                keys=array("L", [hand.sort_key() for hand in hands[1::2]]),
+                bids=array("Q", [hand.bid for hand in hands[1::2]]),
+            )
+            self.assertEqual(ranker.total(), table.total_winnings())
+
+            for hand in hands[1::2]:
+                ranker.remove(hand)
+            self.assertEqual(ranker.total(), 0)
+
+    def test_ties(self):
+        ranker = Ranker(PartOne.Hand)
+        hands = [
+            PartOne.Hand("AAAAA", 5),
+            PartOne.Hand("AAAAA", 2),
+            PartOne.Hand("23456", 7),
+            PartOne.Hand("AAAAA", 9),
+        ]
+        for hand in hands:
+            ranker.add(hand)
+        self.assertEqual(ranker.total(), 1 * 7 + 2 * 9 + 3 * 2 + 4 * 5)
+        table = PartOne.Table(
+            keys=array("L", [hand.sort_key() for hand in hands]),
+            bids=array("Q", [hand.bid for hand in hands]),
+        )
+        self.assertEqual(ranker.total(), table.total_winnings())
+        ranker.remove(PartOne.Hand("AAAAA", 5))
+        self.assertEqual(ranker.total(), 1 * 7 + 2 * 9 + 3 * 2)
+        with self.assertRaises(ValueError):
+            ranker.remove(PartOne.Hand("AAAAA", 5))
+
+    def test_many_ties(self):
+        hands = [PartOne.Hand("AAAAA", bid) for bid in range(1, 1001)]
+        hands[500:500] = [PartOne.Hand("23456", 4), PartOne.Hand("KKKKK", 3)]
+        ranker = Ranker(PartOne.Hand)
+        for hand in hands:
+            ranker.add(hand)
+        for hand in hands[::3]:
+            ranker.remove(hand)
+        table = PartOne.Table.from_lines(
+            [f"{hand.cards} {hand.bid}" for i, hand in enumerate(hands) if i % 3],
+            PartOne.Hand,
+        )
+        self.assertEqual(ranker.total(), table.total_winnings())
+        self.assertEqual(ranker.ties[PartOne.Hand.key_of("AAAAA")].size, 1024)
+
+    def test_churn(self):
+        # one hand stays while an identical one comes and goes
+        ranker = Ranker(PartOne.Hand)
+        ranker.add(PartOne.Hand("AAAAA", 1))
+        for _ in range(10_000):
+            ranker.add(PartOne.Hand("AAAAA", 2))
+            self.assertEqual(ranker.total(), 1 * 2 + 2 * 1)
+            ranker.remove(PartOne.Hand("AAAAA", 1))
+            ranker.add(PartOne.Hand("AAAAA", 1))
+            self.assertEqual(ranker.total(), 1 * 1 + 2 * 2)
+            ranker.remove(PartOne.Hand("AAAAA", 2))
+        key = PartOne.Hand.key_of("AAAAA")
+        self.assertLessEqual(ranker.next_position[key], 4)
+        self.assertLessEqual(ranker.ties[key].size, 8)
+        self.assertEqual(ranker.total(), 1)
+
+
+class BidTreeTestCase(unittest.TestCase):
+    def test_grow(self):
+        tree = BidTree()
+        points = {0: 5, 3: 7, 6: 1, 12: 2, 37: 4}
+        for position, bid in points.items():
+            tree.update(position, 1, bid)
+        for position in range(45):
+            below = [bid for p, bid in points.items() if p < position]
+            self.assertEqual(tree.prefix(position), (len(below), sum(below)))
+
 
 if __name__ == "__main__":
     unittest.main()
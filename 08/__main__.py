@@ -1,8 +1,16 @@
+import math
+import multiprocessing
+import random
 import re
 import unittest
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import count, cycle, islice
 from pathlib import Path
 from typing import Self
-import math
 
 
 def read_file(file_name: str) -> list[str]:
@@ -10,20 +18,286 @@ def read_file(file_name: str) -> list[str]:
         return [line.strip() for line in f.readlines()]
 
 
+NODE_PATTERN = re.compile(r"(\w+) = \((\w+), (\w+)\)")
+
+
 class Graph(dict[str, dict[str, str]]):
     @classmethod
     def from_lines(cls, lines: list[str]) -> Self:
         graph = cls()
         for line in lines:
-            match = re.fullmatch(r"([\w]{3}) = \(([\w]{3}), ([\w]{3})\)", line)
+            match = NODE_PATTERN.fullmatch(line)
             assert match
             graph[match[1]] = {"L": match[2], "R": match[3]}
         return graph
 
 
-def infinite_instructions(instructions):
-    while True:
-        yield from instructions
+@dataclass(frozen=True)
+class CompiledGraph:
+    names: list[str]
+    ids: dict[str, int]
+    left: array
+    right: array
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> Self:
+        graph = cls(names=[], ids={}, left=array("i"), right=array("i"))
+        for line in lines:
+            match = NODE_PATTERN.fullmatch(line)
+            assert match
+            node, left, right = map(graph._intern, match.groups())
+            graph.left[node] = left
+            graph.right[node] = right
+        assert -1 not in graph.left, "some nodes are never defined"
+        return graph
+
+    def _intern(self, name: str) -> int:
+        node = self.ids.get(name)
+        if node is None:
+            node = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.left.append(-1)
+            self.right.append(-1)
+        return node
+
+    @property
+    def successors(self) -> tuple[array, array]:
+        # indexed by the compiled instruction: 0 for L, 1 for R
+        return self.left, self.right
+
+    def nodes_ending_with(self, suffix: str) -> list[int]:
+        return [node for node, name in enumerate(self.names) if name.endswith(suffix)]
+
+
+def compile_instructions(instructions: str) -> bytes:
+    assert instructions and set(instructions) <= {"L", "R"}
+    return instructions.encode().translate(bytes.maketrans(b"LR", b"\x00\x01"))
+
+
+@dataclass(frozen=True)
+class Block:
+    end: int
+    hits: tuple[int, ...]
+
+
+class BlockTable(dict[int, Block]):
+    # One full pass of the instructions from a node, computed the first time
+    # a walk starts a pass there: where it ends and after how many steps of
+    # the pass it stands on one of the end nodes.
+    def __init__(self, instructions: bytes, graph: CompiledGraph, ends: set[int]):
+        super().__init__()
+        self.instructions = instructions
+        self.graph = graph
+        self.ends = ends
+
+    def __missing__(self, node: int) -> Block:
+        successors = self.graph.successors
+        ends = self.ends
+        start = node
+        hits = []
+        for offset, which in enumerate(self.instructions, 1):
+            node = successors[which][node]
+            if node in ends:
+                hits.append(offset)
+        block = self[start] = Block(end=node, hits=tuple(hits))
+        return block
+
+    def first_hit(self, node: int) -> int:
+        steps = 0
+        seen = set()
+        while not (block := self[node]).hits:
+            if node in seen:
+                raise ValueError(f"{self.graph.names[node]} never reaches an end")
+            seen.add(node)
+            steps += len(self.instructions)
+            node = block.end
+        return steps + block.hits[0]
+
+
+class JumpTable:
+    # Binary lifting over whole instruction passes, plus every node visited
+    # within a pass, so queries never simulate more than a table lookup.
+    def __init__(self, instructions: bytes, graph: CompiledGraph, ends: set[int]):
+        self.period = len(instructions)
+        self.ends = ends
+        successors = graph.successors
+
+        self.paths = array("i", [0]) * (len(graph.names) * self.period)
+        self.hits: list[tuple[int, ...]] = []
+        for start in range(len(graph.names)):
+            node = start
+            hits = []
+            for offset, which in enumerate(instructions):
+                node = successors[which][node]
+                self.paths[start * self.period + offset] = node
+                if node in ends:
+                    hits.append(offset + 1)
+            self.hits.append(tuple(hits))
+
+        # jumps[level][node]: where 2**level passes from node end
+        # reaches[level][node]: whether any of those passes visits an end
+        self.jumps = [array("i", self.paths[self.period - 1 :: self.period])]
+        self.reaches = [bytearray(map(bool, self.hits))]
+
+    def _level(self, level: int) -> tuple[array, bytearray]:
+        while len(self.jumps) <= level:
+            jump, reach = self.jumps[-1], self.reaches[-1]
+            self.jumps.append(array("i", (jump[node] for node in jump)))
+            self.reaches.append(
+                bytearray(reach[node] | reach[jump[node]] for node in range(len(jump)))
+            )
+        return self.jumps[level], self.reaches[level]
+
+    def _skip_passes(self, node: int, passes: int) -> int:
+        for level in range(passes.bit_length()):
+            if passes >> level & 1:
+                node = self._level(level)[0][node]
+        return node
+
+    def node_after(self, node: int, steps: int) -> int:
+        passes, offset = divmod(steps, self.period)
+        node = self._skip_passes(node, passes)
+        return self.paths[node * self.period + offset - 1] if offset else node
+
+    def first_end(self, node: int, steps: int = 0) -> int | None:
+        if steps == 0:
+            if node in self.ends:
+                return 0
+            steps = 1
+
+        # the pass containing the requested step first
+        passes, offset = divmod(steps - 1, self.period)
+        node = self._skip_passes(node, passes)
+        hits = self.hits[node]
+        index = bisect_left(hits, offset + 1)
+        if index < len(hits):
+            return passes * self.period + hits[index]
+
+        # then skip as many passes without ends as possible; within
+        # len(hits) passes a walk has seen every pass it will ever do
+        node = self.jumps[0][node]
+        passes += 1
+        for level in range(len(self.hits).bit_length(), -1, -1):
+            jump, reach = self._level(level)
+            if not reach[node]:
+                node = jump[node]
+                passes += 1 << level
+        if not self.hits[node]:
+            return None
+        return passes * self.period + self.hits[node][0]
+
+
+@dataclass(frozen=True)
+class Cycle:
+    # A walk is on an end node at the steps in tail_ends, then from step
+    # tail on at every step congruent to tail + offset modulo length.
+    tail: int
+    length: int
+    tail_ends: tuple[int, ...]
+    offsets: tuple[int, ...]
+
+    @classmethod
+    def from_blocks(cls, blocks: BlockTable, node: int) -> Self:
+        # Passes start on (node, first instruction) states, so the walk
+        # repeats as soon as a pass starts on a node seen before.
+        period = len(blocks.instructions)
+        seen: dict[int, int] = {}
+        starts = []
+        while node not in seen:
+            seen[node] = len(starts)
+            starts.append(node)
+            node = blocks[node].end
+        tail = seen[node] * period
+        length = (len(starts) - seen[node]) * period
+
+        tail_ends = set()
+        offsets = set()
+        for index, start in enumerate(starts):
+            for hit in blocks[start].hits:
+                step = index * period + hit
+                if step < tail:
+                    tail_ends.add(step)
+                else:
+                    offsets.add((step - tail) % length)
+        return cls(
+            tail=tail,
+            length=length,
+            tail_ends=tuple(sorted(tail_ends)),
+            offsets=tuple(sorted(offsets)),
+        )
+
+    def ends_at(self, step: int) -> bool:
+        if step < self.tail:
+            return step in self.tail_ends
+        return (step - self.tail) % self.length in self.offsets
+
+
+def combine_residues(
+    residues: set[int], modulus: int, others: set[int], other_modulus: int
+) -> tuple[set[int], int]:
+    # generalized CRT, for every pair of compatible residues
+    gcd = math.gcd(modulus, other_modulus)
+    lcm = modulus // gcd * other_modulus
+    inverse = pow(modulus // gcd, -1, other_modulus // gcd)
+    combined = set()
+    for residue in residues:
+        for other in others:
+            if (other - residue) % gcd:
+                continue
+            times = (other - residue) // gcd * inverse % (other_modulus // gcd)
+            combined.add((residue + modulus * times) % lcm)
+    return combined, lcm
+
+
+def first_common_end(cycles: list[Cycle], residue_limit: int = 1 << 16) -> int:
+    # Before the longest tail is over, that walk can only be on an end node
+    # at one of its own tail ends.
+    longest = max(cycles, key=lambda cycle: cycle.tail)
+    for step in longest.tail_ends:
+        if all(cycle.ends_at(step) for cycle in cycles):
+            return step
+
+    # Combine the sparsest cycles while the residues stay few; the cross
+    # product of walks that end every other step would not fit in memory.
+    residues, modulus = {0}, 1
+    remaining = sorted(cycles, key=lambda cycle: len(cycle.offsets), reverse=True)
+    while remaining and (
+        modulus == 1 or len(residues) * len(remaining[-1].offsets) <= residue_limit
+    ):
+        cycle = remaining.pop()
+        residues, modulus = combine_residues(
+            residues,
+            modulus,
+            {(cycle.tail + offset) % cycle.length for offset in cycle.offsets},
+            cycle.length,
+        )
+        if not residues:
+            raise ValueError("the walks never end together")
+
+    # The denser cycles left are checked on every candidate step in order,
+    # up to where all the walks have repeated together.
+    start = max(longest.tail, 1)
+    offsets = sorted((residue - start) % modulus for residue in residues)
+    end = start + math.lcm(modulus, *(cycle.length for cycle in remaining))
+    for base in range(start, end, modulus):
+        for offset in offsets:
+            if all(cycle.ends_at(base + offset) for cycle in remaining):
+                return base + offset
+    raise ValueError("the walks never end together")
+
+
+_worker_blocks: BlockTable
+
+
+def _init_ghost_worker(instructions: bytes, graph: CompiledGraph, ends: set[int]):
+    # Forked workers share the parent's compiled graph copy-on-write, and
+    # each fills its own BlockTable for the ghosts it walks.
+    global _worker_blocks
+    _worker_blocks = BlockTable(instructions, graph, ends)
+
+
+def _ghost_cycle(node: int) -> Cycle:
+    return Cycle.from_blocks(_worker_blocks, node)
 
 
 class PartOne:
@@ -36,17 +310,27 @@ class PartOne:
         graph = Graph.from_lines(lines[2:])
         return instructions, graph
 
+    def parse_compiled(self) -> tuple[bytes, CompiledGraph]:
+        lines = read_file(self.file_name)
+        instructions = compile_instructions(lines[0])
+        graph = CompiledGraph.from_lines(lines[2:])
+        return instructions, graph
+
+    def jump_table(self) -> tuple[CompiledGraph, JumpTable]:
+        instructions, graph = self.parse_compiled()
+        ends = set(graph.nodes_ending_with("Z"))
+        return graph, JumpTable(instructions, graph, ends)
+
+    def parse(self) -> tuple[bytes, CompiledGraph]:
+        return self.parse_compiled()
+
     def solve(self) -> int:
-        instructions, graph = self.parse_input()
+        return self.solve_parsed(self.parse())
 
-        steps = 1
-        current_node = graph["AAA"]
-        for which in infinite_instructions(instructions):
-            next_node = current_node[which]
-            if next_node == "ZZZ":
-                return steps
-            current_node = graph[next_node]
-            steps += 1
+    def solve_parsed(self, parsed: tuple[bytes, CompiledGraph]) -> int:
+        instructions, graph = parsed
+        blocks = BlockTable(instructions, graph, {graph.ids["ZZZ"]})
+        return blocks.first_hit(graph.ids["AAA"])
 
 
 class PartOneTestCase(unittest.TestCase):
@@ -59,6 +343,42 @@ class PartOneTestCase(unittest.TestCase):
         )
         self.assertEqual(graph["AAA"], {"L": "BBB", "R": "CCC"})
 
+    def test_parse_compiled(self):
+        instructions, graph = PartOne("sample_1.txt").parse_compiled()
+        self.assertEqual(instructions, b"\x01\x00")
+        self.assertEqual(graph.names, ["AAA", "BBB", "CCC", "DDD", "EEE", "ZZZ", "GGG"])
+        self.assertEqual(list(graph.left), [1, 3, 5, 3, 4, 5, 6])
+        self.assertEqual(list(graph.right), [2, 4, 6, 3, 4, 5, 6])
+        self.assertEqual(graph.ids["CCC"], 2)
+
+    def test_compiled_graph_long_names(self):
+        graph = CompiledGraph.from_lines(
+            [
+                "START = (A1, ZZZZZZ)",
+                "A1 = (A1, START)",
+                "ZZZZZZ = (ZZZZZZ, ZZZZZZ)",
+            ]
+        )
+        self.assertEqual(graph.names, ["START", "A1", "ZZZZZZ"])
+        self.assertEqual(list(graph.left), [1, 1, 2])
+        self.assertEqual(list(graph.right), [2, 0, 2])
+        blocks = BlockTable(b"\x00\x01\x01", graph, {2})
+        self.assertEqual(blocks.first_hit(0), 3)
+
+    def test_block_table(self):
+        instructions, graph = PartOne("sample_2.txt").parse_compiled()
+        blocks = BlockTable(instructions, graph, {graph.ids["ZZZ"]})
+        self.assertEqual(blocks[graph.ids["AAA"]], Block(graph.ids["BBB"], ()))
+        self.assertEqual(blocks[graph.ids["BBB"]], Block(graph.ids["ZZZ"], (3,)))
+        self.assertEqual(list(blocks), [graph.ids["AAA"], graph.ids["BBB"]])
+        self.assertEqual(blocks.first_hit(graph.ids["AAA"]), 6)
+
+    def test_block_table_unreachable(self):
+        instructions, graph = PartOne("sample_1.txt").parse_compiled()
+        blocks = BlockTable(instructions, graph, {graph.ids["ZZZ"]})
+        with self.assertRaises(ValueError):
+            blocks.first_hit(graph.ids["BBB"])
+
     def test_sample_1(self):
         found_solution = PartOne("sample_1.txt").solve()
         self.assertEqual(found_solution, 2)
@@ -72,27 +392,152 @@ class PartOneTestCase(unittest.TestCase):
         self.assertEqual(found_solution, 12737)
 
 
+class JumpTableTestCase(unittest.TestCase):
+    @staticmethod
+    def simulate(instructions: bytes, graph: CompiledGraph, node: int, steps: int):
+        for which in islice(cycle(instructions), steps):
+            node = graph.successors[which][node]
+        return node
+
+    def test_node_after(self):
+        instructions, graph = PartOne("input.txt").parse_compiled()
+        table = JumpTable(instructions, graph, set(graph.nodes_ending_with("Z")))
+        for node in range(0, len(graph.names), 37):
+            for steps in (0, 1, 280, 281, 282, 1000, 12345):
+                self.assertEqual(
+                    table.node_after(node, steps),
+                    self.simulate(instructions, graph, node, steps),
+                )
+        self.assertEqual(table.node_after(graph.ids["AAA"], 12737), graph.ids["ZZZ"])
+
+    def test_first_end(self):
+        graph, table = PartOne("sample_3.txt").jump_table()
+        ids = graph.ids
+        self.assertEqual(table.first_end(ids["11A"]), 2)
+        self.assertEqual(table.first_end(ids["11A"], 3), 4)
+        self.assertEqual(table.first_end(ids["22A"]), 3)
+        self.assertEqual(table.first_end(ids["22A"], 4), 6)
+        self.assertEqual(table.first_end(ids["22Z"]), 0)
+        self.assertEqual(table.first_end(ids["22Z"], 1), 3)
+        self.assertEqual(table.first_end(ids["XXX"]), None)
+        self.assertEqual(table.first_end(ids["11A"], 10**15 + 1), 10**15 + 2)
+
+    def test_first_end_input(self):
+        graph, table = PartOne("input.txt").jump_table()
+        self.assertEqual(table.first_end(graph.ids["AAA"], 1), 12737)
+        self.assertEqual(table.first_end(graph.ids["AAA"], 12738), 2 * 12737)
+        self.assertEqual(
+            table.first_end(graph.ids["AAA"], 10**13), -(-(10**13) // 12737) * 12737
+        )
+
+
 class PartTwo(PartOne):
-    def solve(self) -> int:
-        instructions, graph = self.parse_input()
+    def solve_parsed(self, parsed: tuple[bytes, CompiledGraph]) -> int:
+        instructions, graph = parsed
+        blocks = BlockTable(instructions, graph, set(graph.nodes_ending_with("Z")))
+        cycles = [
+            Cycle.from_blocks(blocks, node) for node in graph.nodes_ending_with("A")
+        ]
+        return first_common_end(cycles)
 
-        steps = 1
-        current_nodes = [graph[node] for node in graph.keys() if node.endswith("A")]
-        minimum_steps = [0] * len(current_nodes)
-        for which in infinite_instructions(instructions):
-            next_nodes = [node[which] for node in current_nodes]
-            for i, node in enumerate(next_nodes):
-                if minimum_steps[i] == 0 and node.endswith("Z"):
-                    minimum_steps[i] = steps
-            if all(s > 0 for s in minimum_steps):
-                break
-            current_nodes = [graph[next_node] for next_node in next_nodes]
-            steps += 1
+    def solve_parallel(self, workers: int | None = None) -> int:
+        instructions, graph = self.parse_compiled()
+        ends = set(graph.nodes_ending_with("Z"))
 
-        return math.lcm(*minimum_steps)
+        with ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_ghost_worker,
+            initargs=(instructions, graph, ends),
+        ) as pool:
+            cycles = list(pool.map(_ghost_cycle, graph.nodes_ending_with("A")))
+        return first_common_end(cycles)
 
 
 class PartTwoTestCase(unittest.TestCase):
+    def test_cycle(self):
+        instructions, graph = PartTwo("sample_3.txt").parse_compiled()
+        blocks = BlockTable(instructions, graph, set(graph.nodes_ending_with("Z")))
+        self.assertEqual(
+            Cycle.from_blocks(blocks, graph.ids["11A"]), Cycle(2, 2, (), (0,))
+        )
+        self.assertEqual(
+            Cycle.from_blocks(blocks, graph.ids["22A"]), Cycle(2, 6, (), (1, 4))
+        )
+
+    def test_combine_residues(self):
+        self.assertEqual(combine_residues({0}, 1, {2, 3}, 5), ({2, 3}, 5))
+        self.assertEqual(combine_residues({1}, 4, {3}, 6), ({9}, 12))
+        self.assertEqual(combine_residues({0}, 4, {3}, 6), (set(), 12))
+
+    def test_first_common_end(self):
+        self.assertEqual(first_common_end([Cycle(0, 4, (), (0,))]), 4)
+        self.assertEqual(first_common_end([Cycle(5, 4, (3,), (1,))]), 3)
+        self.assertEqual(
+            first_common_end([Cycle(5, 4, (3,), (1,)), Cycle(0, 3, (), (0,))]), 3
+        )
+        self.assertEqual(
+            first_common_end([Cycle(5, 4, (3,), (1,)), Cycle(0, 3, (), (1,))]), 10
+        )
+        with self.assertRaises(ValueError):
+            first_common_end([Cycle(0, 2, (), (0,)), Cycle(0, 2, (), (1,))])
+
+    def test_adversarial_maps(self):
+        def brute_force(instructions, graph, nodes, limit):
+            ends = set(graph.nodes_ending_with("Z"))
+            for step, which in enumerate(islice(cycle(instructions), limit), 1):
+                nodes = [graph.successors[which][node] for node in nodes]
+                if all(node in ends for node in nodes):
+                    return step
+            return None
+
+        rng = random.Random(8)
+        for _ in range(200):
+            names = [f"N{i}{rng.choice('AZBZ')}" for i in range(rng.randint(2, 9))]
+            lines = [
+                f"{name} = ({rng.choice(names)}, {rng.choice(names)})" for name in names
+            ]
+            graph = CompiledGraph.from_lines(lines)
+            instructions = bytes(rng.randint(0, 1) for _ in range(rng.randint(1, 5)))
+            starts = graph.nodes_ending_with("A")
+            if not starts:
+                continue
+            blocks = BlockTable(instructions, graph, set(graph.nodes_ending_with("Z")))
+            cycles = [Cycle.from_blocks(blocks, node) for node in starts]
+            expected = brute_force(instructions, graph, starts, 20_000)
+            for residue_limit in (1, 1 << 16):
+                try:
+                    found_solution = first_common_end(cycles, residue_limit)
+                except ValueError:
+                    found_solution = None
+                self.assertEqual(found_solution, expected, lines)
+
+    def test_dense_rings(self):
+        # every other node of each ring is an end, so the cross product of
+        # their residues would hold about 4e8 values
+        def name(ring, position):
+            if position == 0:
+                return f"G{ring}A"
+            return f"G{ring}N{position}{'Z' if position % 2 else 'B'}"
+
+        lines = [
+            f"{name(ring, i)} = ({name(ring, (i + 1) % p)}, {name(ring, (i + 1) % p)})"
+            for ring, p in enumerate((101, 103, 107, 109, 113))
+            for i in range(p)
+        ]
+        graph = CompiledGraph.from_lines(lines)
+        blocks = BlockTable(b"\x00", graph, set(graph.nodes_ending_with("Z")))
+        cycles = [
+            Cycle.from_blocks(blocks, node) for node in graph.nodes_ending_with("A")
+        ]
+        self.assertEqual(first_common_end(cycles), 1)
+        # the two sparse rings only meet every 101 * 103 steps
+        cycles[:2] = [Cycle(0, cycle.length, (), (0,)) for cycle in cycles[:2]]
+        expected = next(
+            step for step in count(1) if all(cycle.ends_at(step) for cycle in cycles)
+        )
+        self.assertEqual(first_common_end(cycles), expected)
+
     def test_sample_3(self):
         found_solution = PartTwo("sample_3.txt").solve()
         self.assertEqual(found_solution, 6)
@@ -101,6 +546,14 @@ class PartTwoTestCase(unittest.TestCase):
         found_solution = PartTwo("input.txt").solve()
         self.assertEqual(found_solution, 9064949303801)
 
+    def test_sample_3_parallel(self):
+        found_solution = PartTwo("sample_3.txt").solve_parallel(2)
+        self.assertEqual(found_solution, 6)
+
+    def test_solve_parallel(self):
+        found_solution = PartTwo("input.txt").solve_parallel(3)
+        self.assertEqual(found_solution, 9064949303801)
+
 
 if __name__ == "__main__":
     unittest.main()
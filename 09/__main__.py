@@ -1,7 +1,12 @@
+import functools
+import math
+import operator
 import re
 import unittest
+from collections.abc import Iterable
 from itertools import pairwise
 from pathlib import Path
+from typing import Self
 
 
 def read_file(file_name: str) -> list[str]:
@@ -9,7 +14,34 @@ def read_file(file_name: str) -> list[str]:
         return [line.strip() for line in f.readlines()]
 
 
+@functools.cache
+def lagrange_weights(length: int, position: int) -> tuple[int, ...]:
+    # Value at `position` of the lowest-degree polynomial through
+    # (0, history[0]) ... (length - 1, history[-1]), as a weighted sum of the
+    # history; the weights are integers whenever the position is.
+    weights = []
+    for i in range(length):
+        numerator = math.prod(position - j for j in range(length) if j != i)
+        denominator = math.prod(i - j for j in range(length) if j != i)
+        weights.append(numerator // denominator)
+    return tuple(weights)
+
+
+def extrapolate_many(
+    histories: Iterable[list[int]], steps: int = 1, backwards: bool = False
+) -> list[int]:
+    output = []
+    for history in histories:
+        # histories of the same length share the same weights
+        position = -steps if backwards else len(history) - 1 + steps
+        weights = lagrange_weights(len(history), position)
+        output.append(sum(map(operator.mul, weights, history)))
+    return output
+
+
 class PartOne:
+    BACKWARDS = False
+
     def __init__(self, file_name: str) -> None:
         self.file_name = file_name
 
@@ -21,9 +53,14 @@ class PartOne:
     def parse_line(line) -> list[int]:
         return list(map(int, re.findall(r"(-?[\d]+)", line)))
 
+    def parse(self) -> list[list[int]]:
+        return self.parse_input()
+
     def solve(self) -> int:
-        lines = self.parse_input()
-        return sum(self.extrapolate_value(line) for line in lines)
+        return self.solve_parsed(self.parse())
+
+    def solve_parsed(self, lines: list[list[int]]) -> int:
+        return sum(extrapolate_many(lines, backwards=self.BACKWARDS))
 
     @classmethod
     def extrapolate_value(cls, line: list[int]) -> int:
@@ -76,6 +113,37 @@ class PartOneTestCase(unittest.TestCase):
             ],
         )
 
+    def test_lagrange_weights(self):
+        self.assertEqual(lagrange_weights(1, 1), (1,))
+        self.assertEqual(lagrange_weights(3, 3), (1, -3, 3))
+        self.assertEqual(lagrange_weights(3, -1), (3, -3, 1))
+        self.assertEqual(lagrange_weights(4, 1), (0, 1, 0, 0))
+
+    def test_extrapolate_many(self):
+        lines = PartOne("input.txt").parse_input()
+        self.assertEqual(
+            extrapolate_many(lines),
+            [PartOne.extrapolate_value(line) for line in lines],
+        )
+        self.assertEqual(
+            extrapolate_many(lines, backwards=True),
+            [PartTwo.extrapolate_value(line) for line in lines],
+        )
+
+    def test_extrapolate_many_steps(self):
+        for line in PartOne("sample.txt").parse_input() + [[3, -1, 7, 2, 2]]:
+            extended = list(line)
+            for steps in range(1, 5):
+                extended.append(PartOne.extrapolate_value(extended))
+                self.assertEqual(extrapolate_many([line], steps), [extended[-1]])
+
+            extended = list(line)
+            for steps in range(1, 5):
+                extended.insert(0, PartTwo.extrapolate_value(extended))
+                self.assertEqual(
+                    extrapolate_many([line], steps, backwards=True), [extended[0]]
+                )
+
     def test_sample(self):
         found_solution = PartOne("sample.txt").solve()
         self.assertEqual(found_solution, 114)
@@ -86,6 +154,8 @@ class PartOneTestCase(unittest.TestCase):
 
 
 class PartTwo(PartOne):
+    BACKWARDS = True
+
     @classmethod
     def extrapolate_value(cls, line: list[int]) -> int:
         sublists = cls.get_sublists(line)
@@ -111,5 +181,75 @@ class PartTwoTestCase(unittest.TestCase):
         self.assertEqual(found_solution, 923)
 
 
+class Predictor:
+    # Only the last value of every row of the difference pyramid is kept,
+    # without the rows that end in zero, plus the running alternating sum
+    # of the first values that backwards extrapolation needs.
+    __slots__ = ("diagonal", "readings", "previous")
+
+    def __init__(self) -> None:
+        self.diagonal: list[int] = []
+        self.readings = 0
+        self.previous = 0
+
+    @classmethod
+    def from_history(cls, history: Iterable[int]) -> Self:
+        predictor = cls()
+        for value in history:
+            predictor.append(value)
+        return predictor
+
+    def append(self, value: int) -> None:
+        diagonal = [value]
+        for last_value in self.diagonal:
+            diagonal.append(diagonal[-1] - last_value)
+        # rows past the stored ones ended in zero, so they all continue with
+        # the deepest new value, down to the new single-value row
+        depth = self.readings
+        if diagonal[-1] != 0 and len(diagonal) <= depth:
+            diagonal.extend([diagonal[-1]] * (depth - len(diagonal) + 1))
+
+        # the new row starts and ends with the same value
+        first_value = diagonal[depth] if depth < len(diagonal) else 0
+        self.previous += -first_value if depth % 2 else first_value
+        self.readings += 1
+
+        while diagonal and diagonal[-1] == 0:
+            diagonal.pop()
+        self.diagonal = diagonal
+
+    def predict_next(self) -> int:
+        return sum(self.diagonal)
+
+    def predict_prev(self) -> int:
+        return self.previous
+
+
+class PredictorTestCase(unittest.TestCase):
+    def test_sample(self):
+        predictor = Predictor.from_history([10, 13, 16, 21, 30, 45])
+        self.assertEqual(predictor.diagonal, [45, 15, 6, 2])
+        self.assertEqual(predictor.predict_next(), 68)
+        self.assertEqual(predictor.predict_prev(), 5)
+
+    def test_matches_parts(self):
+        for line in PartOne("input.txt").parse_input():
+            predictor = Predictor()
+            for length, value in enumerate(line, 1):
+                predictor.append(value)
+                self.assertEqual(
+                    predictor.predict_next(), PartOne.extrapolate_value(line[:length])
+                )
+                self.assertEqual(
+                    predictor.predict_prev(), PartTwo.extrapolate_value(line[:length])
+                )
+
+    def test_bounded_memory(self):
+        predictor = Predictor.from_history(3 * x**2 - x + 7 for x in range(10_000))
+        self.assertEqual(len(predictor.diagonal), 3)
+        self.assertEqual(predictor.predict_next(), 3 * 10_000**2 - 10_000 + 7)
+        self.assertEqual(predictor.predict_prev(), 3 + 1 + 7)
+
+
 if __name__ == "__main__":
     unittest.main()
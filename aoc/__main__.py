@@ -0,0 +1,154 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from . import bench, days, generate, runner
+
+
+def input_path(value: str) -> str:
+    # paths that exist from here are made absolute, anything else is looked
+    # up in the day directory like the tests do ("sample.txt")
+    path = Path(value)
+    return str(path.resolve()) if path.exists() else value
+
+
+def day_name(value: str) -> str:
+    return f"{int(value):02d}"
+
+
+def run_command(args: argparse.Namespace) -> None:
+    selected_days = [args.day] if args.day else days.days()
+    runs = []
+    for day in selected_days:
+        for part, solver in days.solvers(day).items():
+            if args.part and part != args.part:
+                continue
+            run = runner.run_isolated(day, part, args.input, args.repeat)
+            runs.append(run)
+            if not args.json:
+                print(run.describe(), flush=True)
+    if args.json:
+        print(json.dumps([run.to_json() for run in runs], indent=2))
+
+
+def generate_command(args: argparse.Namespace) -> None:
+    options = {}
+    if args.ghosts is not None:
+        if args.day != "08":
+            raise SystemExit("--ghosts only applies to day 08")
+        options["ghosts"] = args.ghosts
+    record = generate.generate(
+        args.day,
+        args.output,
+        args.size,
+        args.seed,
+        answers=not args.skip_answers,
+        **options,
+    )
+    print(json.dumps(record["answers"]))
+
+
+def print_slopes(cases: list[bench.Case]) -> None:
+    for (day, part), exponent in bench.slopes(cases).items():
+        print(f"day {day} part {part}: time ~ n^{exponent:.2f}")
+
+
+def bench_command(args: argparse.Namespace) -> None:
+    selected_days = [args.day] if args.day else days.days()
+    cases = bench.bench(
+        selected_days,
+        repeat=args.repeat,
+        seed=args.seed,
+        scale=args.scale,
+        progress=lambda case: print(case.describe(), flush=True),
+    )
+    print_slopes(cases)
+    if args.save:
+        results = bench.Results(args.seed, args.scale, args.repeat, cases)
+        bench.save(results, args.save)
+
+
+def compare_command(args: argparse.Namespace) -> None:
+    baseline = bench.load(args.baseline)
+    for difference in baseline.environment_differences():
+        print(f"warning: the baseline was measured on {difference}", file=sys.stderr)
+    if args.current:
+        current = bench.load(args.current).cases
+    else:
+        # the same inputs as the baseline: same days, seed and scale
+        current = bench.bench(
+            sorted({case.day for case in baseline.cases}),
+            repeat=args.repeat or baseline.repeat,
+            seed=baseline.seed,
+            scale=baseline.scale,
+        )
+    comparisons = bench.compare(baseline.cases, current, args.alpha, args.tolerance)
+    for comparison in comparisons:
+        print(comparison.describe())
+    print_slopes(current)
+    if not comparisons:
+        sys.exit("no benchmark matches the baseline")
+    if any(comparison.failed for comparison in comparisons):
+        sys.exit(1)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m aoc")
+    commands = parser.add_subparsers(required=True)
+
+    run_parser = commands.add_parser("run", help="solve and time days")
+    run_parser.add_argument("--day", type=day_name, help="all days by default")
+    run_parser.add_argument("--part", type=int, choices=(1, 2))
+    run_parser.add_argument("--input", type=input_path, default="input.txt")
+    run_parser.add_argument("--repeat", type=int, default=1)
+    run_parser.add_argument("--json", action="store_true")
+    run_parser.set_defaults(command=run_command)
+
+    generate_parser = commands.add_parser(
+        "generate", help="write a seeded input and its reference answers"
+    )
+    generate_parser.add_argument("--day", type=day_name, required=True)
+    generate_parser.add_argument("--size", type=int, required=True)
+    generate_parser.add_argument("--seed", type=int, default=0)
+    generate_parser.add_argument("--output", type=Path, required=True)
+    generate_parser.add_argument("--skip-answers", action="store_true")
+    generate_parser.add_argument(
+        "--ghosts", type=int, help="number of ..A nodes for day 08 (6 by default)"
+    )
+    generate_parser.set_defaults(command=generate_command)
+
+    bench_parser = commands.add_parser(
+        "bench", help="time every day over a ladder of generated inputs"
+    )
+    bench_parser.add_argument("--day", type=day_name, help="all days by default")
+    bench_parser.add_argument("--repeat", type=int, default=5)
+    bench_parser.add_argument("--seed", type=int, default=0)
+    bench_parser.add_argument("--scale", type=float, default=1)
+    bench_parser.add_argument(
+        "--save", type=Path, help=f"e.g. {bench.BENCHMARKS_DIR.name}/baseline.json"
+    )
+    bench_parser.set_defaults(command=bench_command)
+
+    compare_parser = commands.add_parser(
+        "compare", help="flag significant slowdowns against a saved baseline"
+    )
+    compare_parser.add_argument(
+        "baseline", type=Path, nargs="?", default=bench.BENCHMARKS_DIR / "baseline.json"
+    )
+    compare_parser.add_argument(
+        "--current", type=Path, help="saved results instead of a new bench run"
+    )
+    compare_parser.add_argument(
+        "--repeat", type=int, help="the baseline's repeat count by default"
+    )
+    compare_parser.add_argument("--alpha", type=float, default=0.01)
+    compare_parser.add_argument("--tolerance", type=float, default=1.05)
+    compare_parser.set_defaults(command=compare_command)
+
+    args = parser.parse_args(argv)
+    args.command(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import json
+import math
+import platform
+import statistics
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from . import days, generate, runner
+
+BENCHMARKS_DIR = days.ROOT / "benchmarks"
+
+# input sizes given to the generators; day 03 sizes are grid sides and day 08
+# needs larger sizes before its rings (and so its answers) start growing
+LADDER = (3_000, 10_000, 30_000)
+LADDERS = {"03": (50, 100, 300), "08": (30_000, 100_000, 300_000)}
+
+
+@dataclass(frozen=True)
+class Case:
+    day: str
+    part: int
+    size: int
+    units: int
+    unit: str
+    answer: int
+    seconds: list[float]
+
+    @property
+    def key(self) -> tuple[str, int, int]:
+        return self.day, self.part, self.size
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.seconds)
+
+    def percentile(self, percent: int) -> float:
+        if len(self.seconds) == 1:
+            return self.seconds[0]
+        return statistics.quantiles(self.seconds, n=100, method="inclusive")[
+            percent - 1
+        ]
+
+    @property
+    def throughput(self) -> float:
+        return self.units / self.median
+
+    def describe(self) -> str:
+        return (
+            f"day {self.day} part {self.part} size {self.size:>7}:"
+            f"  median {self.median * 1000:9.2f} ms"
+            f"  p90 {self.percentile(90) * 1000:9.2f} ms"
+            f"  p95 {self.percentile(95) * 1000:9.2f} ms"
+            f"  {self.throughput:12,.0f} {self.unit}/s"
+        )
+
+
+def count_units(day: str, path: Path) -> tuple[int, str]:
+    with path.open() as lines:
+        if day == "03":
+            return sum(len(line.rstrip("\n")) for line in lines), "cells"
+        return sum(1 for _ in lines), "lines"
+
+
+def slope(cases: list[Case]) -> float:
+    # exponent k of time ~ units**k, fitted on a log-log scale
+    fit = statistics.linear_regression(
+        [math.log(case.units) for case in cases],
+        [math.log(case.median) for case in cases],
+    )
+    return fit.slope
+
+
+def slopes(cases: list[Case]) -> dict[tuple[str, int], float]:
+    curves = {}
+    for case in cases:
+        curves.setdefault((case.day, case.part), []).append(case)
+    return {
+        curve: slope(points)
+        for curve, points in curves.items()
+        if len({point.units for point in points}) > 1
+    }
+
+
+def bench(
+    selected_days: list[str],
+    repeat: int = 5,
+    seed: int = 0,
+    scale: float = 1,
+    progress=None,
+) -> list[Case]:
+    cases = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for day in selected_days:
+            for size in LADDERS.get(day, LADDER):
+                size = max(1, round(size * scale))
+                path = Path(temp_dir, f"day{day}_{size}.txt")
+                generate.generate(day, path, size, seed, answers=False)
+                units, unit = count_units(day, path)
+                for part, solver in days.solvers(day).items():
+                    seconds = []
+                    answers = set()
+                    for _ in range(repeat):
+                        answer, elapsed = runner.timed(solver.solve, str(path))
+                        seconds.append(elapsed)
+                        answers.add(answer)
+                    assert len(answers) == 1, f"answers changed between runs: {answers}"
+                    case = Case(day, part, size, units, unit, answers.pop(), seconds)
+                    cases.append(case)
+                    if progress:
+                        progress(case)
+    return cases
+
+
+@dataclass(frozen=True)
+class Results:
+    # everything needed to run the same cases again
+    seed: int
+    scale: float
+    repeat: int
+    cases: list[Case]
+    python: str = platform.python_version()
+    machine: str = platform.machine()
+
+    def environment_differences(self) -> list[str]:
+        # patch releases are not expected to change timings
+        differences = []
+        python = platform.python_version()
+        if python.rsplit(".", 1)[0] != self.python.rsplit(".", 1)[0]:
+            differences.append(f"Python {self.python}, running {python}")
+        if platform.machine() != self.machine:
+            differences.append(f"{self.machine}, running on {platform.machine()}")
+        return differences
+
+
+def save(results: Results, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(asdict(results), indent=2) + "\n")
+
+
+def load(path: Path) -> Results:
+    record = json.loads(path.read_text())
+    cases = [Case(**case) for case in record.pop("cases")]
+    return Results(cases=cases, **record)
+
+
+def mann_whitney_greater(first: list[float], second: list[float]) -> float:
+    # One-sided p-value for "first tends to be larger than second", using the
+    # normal approximation of the U statistic with a correction for ties.
+    samples = sorted([(value, 0) for value in first] + [(value, 1) for value in second])
+    ranks = [0.0] * len(samples)
+    tie_term = 0
+    start = 0
+    while start < len(samples):
+        end = start
+        while end < len(samples) and samples[end][0] == samples[start][0]:
+            end += 1
+        for index in range(start, end):
+            ranks[index] = (start + end + 1) / 2
+        tie_term += (end - start) ** 3 - (end - start)
+        start = end
+
+    n1, n2 = len(first), len(second)
+    n = n1 + n2
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, samples) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance == 0:
+        return 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return 1 - statistics.NormalDist().cdf(z)
+
+
+@dataclass(frozen=True)
+class Comparison:
+    baseline: Case
+    current: Case
+    p_value: float
+    slower: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.current.median / self.baseline.median
+
+    @property
+    def answer_changed(self) -> bool:
+        return self.current.answer != self.baseline.answer
+
+    @property
+    def failed(self) -> bool:
+        return self.slower or self.answer_changed
+
+    def describe(self) -> str:
+        if self.answer_changed:
+            return (
+                f"day {self.current.day} part {self.current.part}"
+                f" size {self.current.size:>7}:"
+                f"  answer {self.baseline.answer} -> {self.current.answer}"
+                "  ANSWER CHANGED"
+            )
+        verdict = "SLOWER" if self.slower else "ok"
+        return (
+            f"day {self.current.day} part {self.current.part}"
+            f" size {self.current.size:>7}:"
+            f"  {self.baseline.median * 1000:9.2f} ms ->"
+            f" {self.current.median * 1000:9.2f} ms"
+            f"  x{self.ratio:.2f}  p={self.p_value:.4f}  {verdict}"
+        )
+
+
+def compare(
+    baseline: list[Case],
+    current: list[Case],
+    alpha: float = 0.01,
+    tolerance: float = 1.05,
+) -> list[Comparison]:
+    # a slowdown must be both statistically significant and larger than the
+    # tolerance, so that tiny but consistent differences are not reported
+    baseline_cases = {case.key: case for case in baseline}
+    comparisons = []
+    for case in current:
+        if case.key not in baseline_cases:
+            continue
+        before = baseline_cases[case.key]
+        p_value = mann_whitney_greater(case.seconds, before.seconds)
+        slower = p_value < alpha and case.median > before.median * tolerance
+        comparisons.append(Comparison(before, case, p_value, slower))
+    return comparisons
@@ -0,0 +1,77 @@
+import functools
+import importlib.util
+import re
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+ROOT = Path(__file__).parent.parent
+
+
+@dataclass(frozen=True)
+class Solver:
+    day: str
+    part: int
+    parse: Callable[[str], Any]
+    # the answer from what parse returned for the same file
+    solve_parsed: Callable[[str, Any], int]
+    solve: Callable[[str], int]
+
+
+def days() -> list[str]:
+    return sorted(
+        path.parent.name
+        for path in ROOT.glob("*/__main__.py")
+        if re.fullmatch(r"\d+", path.parent.name)
+    )
+
+
+@functools.cache
+def load(day: str) -> ModuleType:
+    # Day directories are not importable names, so load them by path; the
+    # module is registered so process pools and pickling can find it.
+    name = f"day{day}"
+    spec = importlib.util.spec_from_file_location(name, ROOT / day / "__main__.py")
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def solvers(day: str) -> dict[int, Solver]:
+    module = load(day)
+    found = {}
+    for part, class_name, function_name in (
+        (1, "PartOne", "solve_part_one"),
+        (2, "PartTwo", "solve_part_two"),
+    ):
+        if part_class := getattr(module, class_name, None):
+            found[part] = Solver(
+                day=day,
+                part=part,
+                parse=lambda file_name, part_class=part_class: part_class(
+                    file_name
+                ).parse(),
+                solve_parsed=lambda file_name, parsed, part_class=part_class: (
+                    part_class(file_name).solve_parsed(parsed)
+                ),
+                solve=lambda file_name, part_class=part_class: part_class(
+                    file_name
+                ).solve(),
+            )
+        elif function := getattr(module, function_name, None):
+            lines_function = getattr(module, f"{function_name}_lines")
+            found[part] = Solver(
+                day=day,
+                part=part,
+                parse=module.file_lines,
+                solve_parsed=lambda file_name, lines, lines_function=lines_function: (
+                    lines_function(lines)
+                ),
+                solve=function,
+            )
+    return found
@@ -0,0 +1,26 @@
+import importlib
+import json
+import random
+from pathlib import Path
+
+from . import days
+
+
+def generate(
+    day: str, path: Path, size: int, seed: int, answers: bool = True, **options
+):
+    # options are passed on to the day's generator, e.g. ghosts for day 08
+    generator = importlib.import_module(f"{__package__}.generators.day{day}")
+    with path.open("w") as out:
+        generator.generate(out, size, random.Random(seed), **options)
+
+    record = {"day": day, "size": size, "seed": seed, **options, "answers": {}}
+    if answers:
+        for part, solver in days.solvers(day).items():
+            record["answers"][str(part)] = solver.solve(str(path.resolve()))
+    answers_path(path).write_text(json.dumps(record, indent=2) + "\n")
+    return record
+
+
+def answers_path(path: Path) -> Path:
+    return path.with_name(path.name + ".json")
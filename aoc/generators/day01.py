@@ -0,0 +1,35 @@
+import random
+import string
+from typing import TextIO
+
+SPELLED_DIGITS = [
+    "one",
+    "two",
+    "three",
+    "four",
+    "five",
+    "six",
+    "seven",
+    "eight",
+    "nine",
+]
+
+
+def generate(out: TextIO, size: int, rng: random.Random) -> None:
+    # size calibration lines, each with at least one plain digit
+    for _ in range(size):
+        pieces = []
+        for _ in range(rng.randint(1, 12)):
+            match rng.random():
+                case roll if roll < 0.2:
+                    pieces.append(rng.choice(string.digits[1:]))
+                case roll if roll < 0.45:
+                    pieces.append(rng.choice(SPELLED_DIGITS))
+                case _:
+                    pieces.append(
+                        "".join(
+                            rng.choices(string.ascii_lowercase, k=rng.randint(1, 5))
+                        )
+                    )
+        pieces.insert(rng.randint(0, len(pieces)), rng.choice(string.digits[1:]))
+        out.write("".join(pieces) + "\n")
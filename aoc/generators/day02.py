@@ -0,0 +1,16 @@
+import random
+from typing import TextIO
+
+COLORS = ["red", "green", "blue"]
+
+
+def generate(out: TextIO, size: int, rng: random.Random) -> None:
+    # size games of one to six sets
+    for game in range(1, size + 1):
+        game_sets = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(COLORS, rng.randint(1, len(COLORS)))
+            game_sets.append(
+                ", ".join(f"{rng.randint(1, 20)} {color}" for color in colors)
+            )
+        out.write(f"Game {game}: {'; '.join(game_sets)}\n")
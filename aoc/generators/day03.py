@@ -0,0 +1,21 @@
+import random
+from typing import TextIO
+
+SYMBOLS = "*#+$/@%=&-"
+
+
+def generate(out: TextIO, size: int, rng: random.Random) -> None:
+    # a size x size schematic, written one row at a time
+    for _ in range(size):
+        row = []
+        while len(row) < size:
+            roll = rng.random()
+            if roll < 0.08 and (not row or not row[-1].isdigit()):
+                length = min(rng.randint(1, 3), size - len(row))
+                row.append(str(rng.randint(1, 9)))
+                row.extend(str(rng.randint(0, 9)) for _ in range(length - 1))
+            elif roll < 0.11:
+                row.append(rng.choice(SYMBOLS))
+            else:
+                row.append(".")
+        out.write("".join(row) + "\n")
@@ -0,0 +1,23 @@
+import random
+from typing import TextIO
+
+# chances of 0 to 10 matching numbers; fewer than one match on average keeps
+# the number of copies in part two from growing without bounds
+MATCHING_WEIGHTS = [70, 10, 6, 4, 3, 2, 1, 1, 1, 1, 1]
+
+
+def generate(out: TextIO, size: int, rng: random.Random) -> None:
+    # size scratchcards of ten winning numbers and twenty-five numbers held
+    width = len(str(size))
+    for card in range(1, size + 1):
+        numbers = rng.sample(range(1, 100), 35)
+        winning = numbers[:10]
+        matching = rng.choices(range(len(MATCHING_WEIGHTS)), MATCHING_WEIGHTS)[0]
+        # cards never win copies of cards past the end of the table
+        matching = min(matching, size - card)
+        having = winning[:matching] + numbers[10 : 35 - matching]
+        rng.shuffle(having)
+        out.write(
+            f"Card {card:>{width}}: {' '.join(f'{n:>2}' for n in winning)}"
+            f" | {' '.join(f'{n:>2}' for n in having)}\n"
+        )
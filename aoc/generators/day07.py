@@ -0,0 +1,10 @@
+import random
+from typing import TextIO
+
+CARDS = "AKQJT98765432"
+
+
+def generate(out: TextIO, size: int, rng: random.Random) -> None:
+    # size hands with bids up to 1000; hands repeat at larger sizes
+    for _ in range(size):
+        out.write(f"{''.join(rng.choices(CARDS, k=5))} {rng.randint(1, 1000)}\n")
@@ -0,0 +1,53 @@
+import itertools
+import random
+from typing import TextIO
+
+
+def primes_from(start: int):
+    for candidate in itertools.count(max(start, 2)):
+        if all(candidate % divisor for divisor in range(2, int(candidate**0.5) + 1)):
+            yield candidate
+
+
+def ring_primes(ghosts: int, budget: int) -> list[int]:
+    # the largest run of consecutive primes whose sum stays within budget,
+    # or the smallest primes when none does
+    start = max(budget // ghosts, 2)
+    while True:
+        primes = list(itertools.islice(primes_from(start), ghosts))
+        if sum(primes) <= budget or start == 2:
+            return primes
+        start -= 1
+
+
+def generate(
+    out: TextIO, size: int, rng: random.Random, ghosts: int = 6, period: int = 281
+) -> None:
+    # About size nodes, down to a minimum set by the number of ghosts. Like
+    # the puzzle inputs, every ghost loops around its own ring of prime *
+    # len(instructions) steps, with one Z position that the first ghost
+    # (AAA) reaches as ZZZ when the instruction there is L.
+    smallest = sum(ring_primes(ghosts, 0))
+    period = min(period, max(size // (2 * smallest), 2))
+    instructions = [rng.choice("LR") for _ in range(period)]
+    instructions[-2:] = ["L", "R"]
+    out.write("".join(instructions) + "\n\n")
+
+    primes = ring_primes(ghosts, size // (2 * period))
+    for ghost, prime in zip(range(ghosts), primes):
+        length = prime * period
+
+        def name(position: int, side: int) -> str:
+            if position == 0 and side == 0:
+                return "AAA" if ghost == 0 else f"G{ghost}A"
+            if position == length - 1:
+                return "ZZZ" if ghost == 0 and side == 0 else f"G{ghost}S{side}Z"
+            return f"G{ghost}N{position}S{side}"
+
+        for position in range(length):
+            following = (position + 1) % length
+            for side in (0, 1):
+                out.write(
+                    f"{name(position, side)} = "
+                    f"({name(following, 0)}, {name(following, 1)})\n"
+                )
@@ -0,0 +1,14 @@
+import random
+from typing import TextIO
+
+
+def generate(out: TextIO, size: int, rng: random.Random, length: int = 21) -> None:
+    # size histories, each sampling a random polynomial of low degree
+    for _ in range(size):
+        coefficients = [rng.randint(-9, 9) for _ in range(rng.randint(1, 8))]
+        coefficients[1:] = [c // (i + 1) ** 2 for i, c in enumerate(coefficients[1:])]
+        values = (
+            sum(c * x**degree for degree, c in enumerate(coefficients))
+            for x in range(length)
+        )
+        out.write(" ".join(map(str, values)) + "\n")
@@ -0,0 +1,96 @@
+import contextlib
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+
+from . import days
+from .days import Solver
+
+
+@dataclass(frozen=True)
+class Run:
+    day: str
+    part: int
+    input: str
+    answer: int
+    parse_seconds: list[float]
+    solve_seconds: list[float]
+    peak_rss_bytes: int
+
+    def describe(self) -> str:
+        return (
+            f"day {self.day} part {self.part}: {self.answer}"
+            f"  parse {format_seconds(self.parse_seconds)}"
+            f"  solve {format_seconds(self.solve_seconds)}"
+            f"  peak RSS {self.peak_rss_bytes / 2**20:.1f} MiB"
+        )
+
+    def to_json(self) -> dict:
+        return asdict(self)
+
+
+def format_seconds(samples: list[float]) -> str:
+    median = statistics.median(samples)
+    if len(samples) == 1:
+        return f"{median * 1000:.2f} ms"
+    return f"{median * 1000:.2f} ms (min {min(samples) * 1000:.2f} ms)"
+
+
+def peak_rss_bytes() -> int:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    # Linux carries ru_maxrss over an exec from the process that forked, so
+    # the high-water mark of this process's own memory is read instead.
+    with contextlib.suppress(OSError):
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    own = int(line.split()[1]) * 1024
+    return max(own, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale)
+
+
+def timed(function, *args) -> tuple[object, float]:
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def run(solver: Solver, file_name: str, repeat: int = 1) -> Run:
+    parse_seconds = []
+    solve_seconds = []
+    answers = set()
+    for _ in range(repeat):
+        parsed, seconds = timed(solver.parse, file_name)
+        parse_seconds.append(seconds)
+        answer, seconds = timed(solver.solve_parsed, file_name, parsed)
+        solve_seconds.append(seconds)
+        answers.add(answer)
+    assert len(answers) == 1, f"answers changed between runs: {answers}"
+
+    return Run(
+        day=solver.day,
+        part=solver.part,
+        input=file_name,
+        answer=answers.pop(),
+        parse_seconds=parse_seconds,
+        solve_seconds=solve_seconds,
+        peak_rss_bytes=peak_rss_bytes(),
+    )
+
+
+def run_isolated(day: str, part: int, file_name: str, repeat: int = 1) -> Run:
+    # ru_maxrss only ever grows within a process, so every solver gets a
+    # fresh one for its peak RSS to be its own.
+    with ProcessPoolExecutor(
+        1, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        return pool.submit(_run_day, day, part, file_name, repeat).result()
+
+
+def _run_day(day: str, part: int, file_name: str, repeat: int) -> Run:
+    return run(days.solvers(day)[part], file_name, repeat)
@@ -0,0 +1,191 @@
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from . import bench, days, generate, runner
+from .__main__ import main
+
+
+class DaysTestCase(unittest.TestCase):
+    def test_days(self):
+        self.assertEqual(days.days(), ["01", "02", "03", "04", "07", "08", "09"])
+
+    def test_solvers(self):
+        for day in days.days():
+            self.assertEqual(list(days.solvers(day)), [1, 2], day)
+
+    def test_solve_parsed(self):
+        for day in days.days():
+            for part, solver in days.solvers(day).items():
+                parsed = solver.parse("input.txt")
+                self.assertEqual(
+                    solver.solve_parsed("input.txt", parsed),
+                    solver.solve("input.txt"),
+                    (day, part),
+                )
+
+    def test_solve(self):
+        solvers = days.solvers("02")
+        self.assertEqual(solvers[1].solve("sample.txt"), 8)
+        self.assertEqual(solvers[2].solve("sample.txt"), 2286)
+        self.assertEqual(days.solvers("01")[2].solve("sample_part2.txt"), 281)
+
+
+class RunnerTestCase(unittest.TestCase):
+    def test_run(self):
+        run = runner.run(days.solvers("09")[1], "sample.txt", repeat=3)
+        self.assertEqual(run.answer, 114)
+        self.assertEqual(len(run.parse_seconds), 3)
+        self.assertEqual(len(run.solve_seconds), 3)
+        self.assertGreater(run.peak_rss_bytes, 0)
+        self.assertTrue(run.describe().startswith("day 09 part 1: 114  parse "))
+
+    def test_run_isolated(self):
+        run = runner.run_isolated("07", 2, "sample.txt")
+        self.assertEqual((run.day, run.part, run.answer), ("07", 2, 5905))
+        self.assertGreater(run.peak_rss_bytes, 0)
+
+    def test_main_json(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(
+                ["run", "--day", "4", "--part", "2", "--input", "sample.txt", "--json"]
+            )
+        (run,) = json.loads(output.getvalue())
+        self.assertEqual((run["day"], run["part"], run["answer"]), ("04", 2, 30))
+
+
+class GenerateTestCase(unittest.TestCase):
+    def test_generate(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for day in days.days():
+                first, second = Path(temp_dir, "first.txt"), Path(
+                    temp_dir, "second.txt"
+                )
+                record = generate.generate(day, first, size=40, seed=7)
+                generate.generate(day, second, size=40, seed=7, answers=False)
+                self.assertEqual(first.read_text(), second.read_text(), day)
+                self.assertEqual(list(record["answers"]), ["1", "2"], day)
+                saved = json.loads(generate.answers_path(first).read_text())
+                self.assertEqual(saved, record, day)
+
+    def test_repeated_hands(self):
+        # identical hands rank by input order, like the original sorted() did
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir, "hands.txt")
+            record = generate.generate("07", path, size=20_000, seed=1)
+            hands = [line.split()[0] for line in path.read_text().splitlines()]
+            self.assertLess(len(set(hands)), len(hands))
+            module = days.load("07")
+            for part in (module.PartOne, module.PartTwo):
+                ranked = reversed(
+                    sorted(part(str(path)).parse_input(), key=part.Hand.sort_key)
+                )
+                expected = sum(rank * hand.bid for rank, hand in enumerate(ranked, 1))
+                answer = record["answers"]["1" if part is module.PartOne else "2"]
+                self.assertEqual(answer, expected)
+
+    def test_ghosts(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir, "ghosts.txt")
+            record = generate.generate("08", path, size=1000, seed=1, ghosts=3)
+            nodes = path.read_text().splitlines()[2:]
+            self.assertLessEqual(len(nodes), 1000)
+            self.assertGreater(len(nodes), 500)
+            starts = [line for line in nodes if line.split()[0].endswith("A")]
+            self.assertEqual(len(starts), 3)
+            self.assertEqual(record["ghosts"], 3)
+
+    def test_seeds_differ(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first, second = Path(temp_dir, "first.txt"), Path(temp_dir, "second.txt")
+            generate.generate("07", first, size=40, seed=1, answers=False)
+            generate.generate("07", second, size=40, seed=2, answers=False)
+            self.assertNotEqual(first.read_text(), second.read_text())
+
+
+class BenchTestCase(unittest.TestCase):
+    @staticmethod
+    def case(size: int, seconds: list[float]) -> bench.Case:
+        return bench.Case("07", 1, size, size, "lines", 0, seconds)
+
+    def test_statistics(self):
+        case = self.case(1000, [0.1, 0.2, 0.3, 0.4, 0.5])
+        self.assertAlmostEqual(case.median, 0.3)
+        self.assertAlmostEqual(case.percentile(90), 0.46)
+        self.assertAlmostEqual(case.throughput, 1000 / 0.3)
+
+    def test_slopes(self):
+        linear = [self.case(n, [n * 1e-6]) for n in (100, 1000, 10000)]
+        quadratic = [
+            bench.Case("07", 2, n, n, "lines", 0, [n * n * 1e-9])
+            for n in (100, 1000, 10000)
+        ]
+        slopes = bench.slopes(linear + quadratic)
+        self.assertAlmostEqual(slopes["07", 1], 1)
+        self.assertAlmostEqual(slopes["07", 2], 2)
+
+    def test_mann_whitney(self):
+        fast = [1.0, 1.1, 1.2, 1.3, 1.4, 1.5]
+        slow = [2.0, 2.1, 2.2, 2.3, 2.4, 2.5]
+        self.assertLess(bench.mann_whitney_greater(slow, fast), 0.01)
+        self.assertGreater(bench.mann_whitney_greater(fast, slow), 0.99)
+        self.assertGreater(bench.mann_whitney_greater(fast, fast), 0.4)
+        self.assertEqual(bench.mann_whitney_greater([1.0] * 3, [1.0] * 3), 1.0)
+
+    def test_compare(self):
+        baseline = [self.case(10, [1.0, 1.1, 1.2, 1.3, 1.4, 1.5])]
+        noisy = [self.case(10, [1.05, 1.15, 1.25, 1.35, 1.45, 1.55])]
+        slower = [self.case(10, [2.0, 2.1, 2.2, 2.3, 2.4, 2.5])]
+        (comparison,) = bench.compare(baseline, noisy)
+        self.assertFalse(comparison.slower)
+        (comparison,) = bench.compare(baseline, slower)
+        self.assertTrue(comparison.slower)
+        self.assertEqual(bench.compare(baseline, [self.case(20, [1.0])]), [])
+        changed = [bench.Case("07", 1, 10, 10, "lines", 1, [1.0, 1.1, 1.2])]
+        (comparison,) = bench.compare(baseline, changed)
+        self.assertTrue(comparison.answer_changed)
+        self.assertTrue(comparison.failed)
+
+    def test_compare_command(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir, "baseline.json")
+            with contextlib.redirect_stdout(io.StringIO()):
+                main(
+                    ["bench", "--day", "9", "--seed", "3", "--scale", "0.01"]
+                    + ["--repeat", "3", "--save", str(path)]
+                )
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                try:
+                    main(["compare", str(path), "--tolerance", "100"])
+                except SystemExit as exit:
+                    self.fail(f"compare exited with {exit.code}")
+            self.assertEqual(output.getvalue().count(" ok\n"), 6)
+
+            results = bench.load(path)
+            bench.save(bench.Results(3, 1, 3, results.cases), path)
+            with contextlib.redirect_stdout(io.StringIO()):
+                with self.assertRaises(SystemExit) as exit:
+                    main(["compare", str(path), "--repeat", "1"])
+            self.assertEqual(exit.exception.code, "no benchmark matches the baseline")
+
+    def test_bench(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cases = bench.bench(["09"], repeat=2, scale=0.01)
+            path = Path(temp_dir, "baseline.json")
+            bench.save(bench.Results(0, 0.01, 2, cases), path)
+            results = bench.load(path)
+            self.assertEqual(results.cases, cases)
+            self.assertEqual((results.seed, results.scale), (0, 0.01))
+            self.assertEqual(results.environment_differences(), [])
+        self.assertEqual([case.size for case in cases[::2]], [30, 100, 300])
+        self.assertEqual({len(case.seconds) for case in cases}, {2})
+        self.assertEqual(cases[0].units, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()